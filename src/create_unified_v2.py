@@ -233,6 +233,16 @@ def create_unified_preamble(course_code: str, course_name: str,
     return preamble
 
 
+def _discover_lectures(course_dir: Path) -> list:
+    """lecture_*/ 폴더에서 강의 tex 파일 탐색 (강의당 1개, 영문본 제외)"""
+    lectures = OrderedDict()
+    for tex_file in sorted(course_dir.glob('lecture_*/*.tex')):
+        if tex_file.stem.endswith('_en'):
+            continue
+        lectures.setdefault(tex_file.parent, tex_file)
+    return list(lectures.values())
+
+
 def create_unified_tex(course_dir: Path, course_code: str, course_name: str,
                        lecture_files: list, output_path: Path):
     """통합 tex 파일 생성"""
@@ -313,64 +323,45 @@ def main():
 
     # MIT 과목들
     mit_courses = [
-        ("18.6501", "Fundamentals of Statistics", 12),
-        ("6.419", "Statistics for Data Science", 12),
-        ("6.431", "Probabilistic Systems Analysis", 9),
-        ("6.86", "Introduction to Machine Learning", 14),
+        ("18.6501", "Fundamentals of Statistics"),
+        ("6.419", "Statistics for Data Science"),
+        ("6.431", "Probabilistic Systems Analysis"),
+        ("6.86", "Introduction to Machine Learning"),
     ]
 
-    for code, name, num_lectures in mit_courses:
+    for code, name in mit_courses:
         course_dir = base_dir / "mit" / code
-        lecture_files = [
-            course_dir / f"lecture_{i:02d}" / f"{i}.tex"
-            for i in range(1, num_lectures + 1)
-        ]
+        lecture_files = _discover_lectures(course_dir)
         output_path = base_dir / "mit" / f"{code}_unified.tex"
         create_unified_tex(course_dir, code, name, lecture_files, output_path)
 
     # Stanford CS230
     stanford_dir = base_dir / "stanford" / "cs230"
-    lecture_files = [
-        stanford_dir / f"lecture_{i:02d}" / f"{i}.tex"
-        for i in range(1, 52)
-    ]
+    lecture_files = _discover_lectures(stanford_dir)
     output_path = base_dir / "stanford" / "CS230_unified.tex"
     create_unified_tex(stanford_dir, "CS230", "Deep Learning", lecture_files, output_path)
 
     # Harvard CS109A
     cs109_dir = base_dir / "harvard" / "cs109"
-    lecture_files = [
-        cs109_dir / f"lecture_{i:02d}" / f"{i}.tex"
-        for i in range(1, 26)
-    ]
+    lecture_files = _discover_lectures(cs109_dir)
     output_path = cs109_dir / "CS109A_unified.tex"
     create_unified_tex(cs109_dir, "CS109A", "Introduction to Data Science", lecture_files, output_path)
 
     # Harvard CSCI103
     csci103_dir = base_dir / "harvard" / "csci103"
-    lecture_files = [
-        csci103_dir / f"lecture_{i:02d}" / f"{i}.tex"
-        for i in range(1, 15)
-    ]
+    lecture_files = _discover_lectures(csci103_dir)
     output_path = csci103_dir / "CSCI103_unified.tex"
     create_unified_tex(csci103_dir, "CSCI103", "Data Engineering", lecture_files, output_path)
 
-    # Harvard CSCI89 (특수 파일명)
+    # Harvard CSCI89 (특수 파일명 - csci89_NN.tex / N.tex 혼용)
     csci89_dir = base_dir / "harvard" / "csci89"
-    lecture_files = []
-    for i in range(1, 9):
-        lecture_files.append(csci89_dir / f"lecture_{i:02d}" / f"csci89_{i:02d}.tex")
-    for i in range(9, 14):
-        lecture_files.append(csci89_dir / f"lecture_{i:02d}" / f"{i}.tex")
+    lecture_files = _discover_lectures(csci89_dir)
     output_path = csci89_dir / "CSCI89_unified.tex"
     create_unified_tex(csci89_dir, "CSCI89", "Introduction to NLP", lecture_files, output_path)
 
     # UIUC FIN574
     uiuc_dir = base_dir / "uiuc" / "fin-574"
-    lecture_files = [
-        uiuc_dir / f"lecture_{i:02d}" / f"fin574_{i:02d}.tex"
-        for i in range(1, 3)
-    ]
+    lecture_files = _discover_lectures(uiuc_dir)
     output_path = uiuc_dir / "FIN574_unified.tex"
     create_unified_tex(uiuc_dir, "FIN574", "Firm Level Economics", lecture_files, output_path)
 
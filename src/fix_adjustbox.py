@@ -7,6 +7,15 @@ adjustbox를 제거하고 tabularx로 변환하는 스크립트
 import re
 from pathlib import Path
 
+# adjustbox 시작: \adjustbox{max width=\textwidth}{ \begin{tabular}{...}
+_ADJUSTBOX_TABULAR_RE = re.compile(
+    r'\\adjustbox\{max width=\\textwidth\}\{\s*\\begin\{tabular\}\{([^}]+)\}',
+    re.ASCII
+)
+
+# 종료 부분: \end{tabular} \n } \n \end{adjustbox}
+_ADJUSTBOX_END_RE = re.compile(r'\\end\{tabular\}\s*\}\s*\\end\{adjustbox\}', re.ASCII)
+
 def fix_adjustbox_in_file(filepath):
     """파일에서 adjustbox를 tabularx로 변환"""
     with open(filepath, 'r', encoding='utf-8') as f:
@@ -18,9 +27,6 @@ def fix_adjustbox_in_file(filepath):
     # Pattern 1: \adjustbox{max width=\textwidth}{ ... \begin{tabular}{ll} ... }
     # -> \begin{tabularx}{\textwidth}{lX}
 
-    # adjustbox 시작 찾기
-    pattern = r'\\adjustbox\{max width=\\textwidth\}\{\s*\\begin\{tabular\}\{([^}]+)\}'
-
     def replace_adjustbox(match):
         nonlocal changes_made
         col_spec = match.group(1)
@@ -40,14 +46,10 @@ def fix_adjustbox_in_file(filepath):
         return f'\\begin{{tabularx}}{{\\textwidth}}{{{new_spec}}}'
 
     # adjustbox + tabular 시작 부분을 tabularx로 변환
-    content = re.sub(pattern, replace_adjustbox, content)
+    content = _ADJUSTBOX_TABULAR_RE.sub(replace_adjustbox, content)
 
     # 종료 부분 수정: \end{tabular} \n } \n \end{adjustbox} -> \end{tabularx}
-    content = re.sub(
-        r'\\end\{tabular\}\s*\}\s*\\end\{adjustbox\}',
-        r'\\end{tabularx}',
-        content
-    )
+    content = _ADJUSTBOX_END_RE.sub(r'\\end{tabularx}', content)
 
     if content != original_content:
         with open(filepath, 'w', encoding='utf-8') as f:
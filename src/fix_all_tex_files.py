@@ -6,9 +6,60 @@
 - 통합본 재생성 (실제 내용 포함)
 """
 
+import hashlib
+import json
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Dict, List, Optional
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import iter_tex, largest_first, read_text_if_contains, write_text_atomic
+
+
+# 테이블 너비 수정 (고정 문자열 치환: 원래 열 정의 → tabularx 열 정의)
+_TABULAR_WIDTH_FIXES = [
+    # 패턴 1: p{0.3\textwidth}|p{0.65\textwidth} (합계 0.95)
+    ('\\begin{tabular}{|p{0.3\\textwidth}|p{0.65\\textwidth}|}',
+     '\\begin{tabularx}{\\textwidth}{|p{0.28\\textwidth}|X|}'),
+    ('\\begin{tabular}{p{0.3\\textwidth}|p{0.65\\textwidth}}',
+     '\\begin{tabularx}{\\textwidth}{p{0.28\\textwidth}|X}'),
+    # 패턴 2: 0.4 + 0.6 = 1.0 (테두리로 오버플로우)
+    ('\\begin{tabular}{|p{0.4\\textwidth}|p{0.6\\textwidth}|}',
+     '\\begin{tabularx}{\\textwidth}{|p{0.35\\textwidth}|X|}'),
+    # 패턴 3: 세 개 이상 컬럼
+    ('\\begin{tabular}{|p{0.25\\textwidth}|p{0.25\\textwidth}|p{0.5\\textwidth}|}',
+     '\\begin{tabularx}{\\textwidth}{|p{0.2\\textwidth}|p{0.2\\textwidth}|X|}'),
+]
+
+# \begin{tabularx} 뒤의 짝이 맞지 않는 \end{tabular}
+# (올바른 \end{tabularx}나 중첩된 \begin{tabular}를 넘어가지 않음)
+_TABULARX_WRONG_END = re.compile(
+    r'(\\begin\{tabularx\}(?:(?!\\end\{tabularx\}|\\begin\{tabular\}).)*?)\\end\{tabular\}',
+    re.DOTALL | re.ASCII
+)
+
+# preamble/본문 정리 패턴
+_GEOMETRY_RE = re.compile(r'\\geometry\{[^}]*\}\n?', re.ASCII)
+_USEPACKAGE_RE = re.compile(r'\\usepackage(\[[^\]]*\])?\{[^}]*\}\n?', re.ASCII)
+
+# lstlisting 패턴
+_LSTSET_FRAME_RE = re.compile(r'(\\lstset\{[^}]*)(frame=single)', re.ASCII)
+_LSTLISTING_NOOPT = re.compile(r'\\begin\{lstlisting\}(?!\[)', re.ASCII)
+_LSTLISTING_OPT = re.compile(r'\\begin\{lstlisting\}\[(?![^\]]*breaklines)([^\]]+)\]', re.ASCII)
+
+# fix_tex_file의 수정 단계가 반응하는 명령 (adjustbox 추가도 \usepackage에 포함)
+_FIX_TRIGGERS = (b'tabular', b'\\geometry', b'\\usepackage', b'\\lstset', b'\\begin{lstlisting}')
+
+# 이전 실행 결과 캐시 파일명 ({"version": ..., "files": {상대 경로: [mtime_ns, size]}})
+_CACHE_NAME = '.tex-fix-cache.json'
+
+# tabular 블록 패턴
+_TABULAR_BLOCK = re.compile(r'(\\begin\{tabular\}\{[^}]+\}.*?)(\\end\{tabular\})', re.DOTALL | re.ASCII)
 
 
 def fix_table_widths(content: str) -> str:
@@ -17,57 +68,28 @@ def fix_table_widths(content: str) -> str:
     - p{0.3\textwidth}|p{0.65\textwidth} → p{0.28\textwidth}|X (tabularx)
     - 테두리 포함 시 총합 0.9 이하로 조정
     """
-    # 패턴 1: p{0.3\textwidth}|p{0.65\textwidth} (합계 0.95)
-    content = re.sub(
-        r'\\begin\{tabular\}\{\|p\{0\.3\\textwidth\}\|p\{0\.65\\textwidth\}\|\}',
-        r'\\begin{tabularx}{\\textwidth}{|p{0.28\\textwidth}|X|}',
-        content
-    )
-    content = re.sub(
-        r'\\begin\{tabular\}\{p\{0\.3\\textwidth\}\|p\{0\.65\\textwidth\}\}',
-        r'\\begin{tabularx}{\\textwidth}{p{0.28\\textwidth}|X}',
-        content
-    )
-
-    # 패턴 2: 0.4 + 0.6 = 1.0 (테두리로 오버플로우)
-    content = re.sub(
-        r'\\begin\{tabular\}\{\|p\{0\.4\\textwidth\}\|p\{0\.6\\textwidth\}\|\}',
-        r'\\begin{tabularx}{\\textwidth}{|p{0.35\\textwidth}|X|}',
-        content
-    )
-
-    # 패턴 3: 세 개 이상 컬럼
-    content = re.sub(
-        r'\\begin\{tabular\}\{\|p\{0\.25\\textwidth\}\|p\{0\.25\\textwidth\}\|p\{0\.5\\textwidth\}\|\}',
-        r'\\begin{tabularx}{\\textwidth}{|p{0.2\\textwidth}|p{0.2\\textwidth}|X|}',
-        content
-    )
+    # 고정 문자열이므로 정규식 대신 str.replace 사용 (없으면 건너뜀)
+    for old, new in _TABULAR_WIDTH_FIXES:
+        if old in content:
+            content = content.replace(old, new)
 
     # tabular → tabularx 로 변환 후 \end{tabular} → \end{tabularx}
     # 주의: 모든 tabular를 변환하지 않고, 위에서 변환된 것만 처리
-    lines = content.split('\n')
-    result = []
-    in_tabularx = False
-
-    for line in lines:
-        if '\\begin{tabularx}' in line:
-            in_tabularx = True
-        if in_tabularx and '\\end{tabular}' in line:
-            line = line.replace('\\end{tabular}', '\\end{tabularx}')
-            in_tabularx = False
-        result.append(line)
+    content = _TABULARX_WRONG_END.sub(r'\1\\end{tabularx}', content)
 
-    return '\n'.join(result)
+    return content
 
 
-def remove_duplicate_geometry(content: str) -> str:
+def remove_duplicate_geometry(content: str, doc_start: int) -> str:
     """
     본문 내 중복 \geometry 선언 제거
     - preamble의 첫 번째 \geometry만 유지
     - \begin{document} 이후의 \geometry 모두 제거
+
+    Args:
+        content: 파일 내용
+        doc_start: \begin{document} 위치 (없으면 -1)
     """
-    # \begin{document} 위치 찾기
-    doc_start = content.find('\\begin{document}')
     if doc_start == -1:
         return content
 
@@ -76,16 +98,21 @@ def remove_duplicate_geometry(content: str) -> str:
     body = content[doc_start:]
 
     # 본문의 \geometry 라인 제거
-    body = re.sub(r'\\geometry\{[^}]*\}\n?', '', body)
+    new_body = _GEOMETRY_RE.sub('', body)
+    if new_body is body:
+        return content
 
-    return preamble + body
+    return preamble + new_body
 
 
-def remove_duplicate_usepackage_in_body(content: str) -> str:
+def remove_duplicate_usepackage_in_body(content: str, doc_start: int) -> str:
     """
     본문 내 중복 usepackage 선언 제거
+
+    Args:
+        content: 파일 내용
+        doc_start: \begin{document} 위치 (없으면 -1)
     """
-    doc_start = content.find('\\begin{document}')
     if doc_start == -1:
         return content
 
@@ -93,9 +120,11 @@ def remove_duplicate_usepackage_in_body(content: str) -> str:
     body = content[doc_start:]
 
     # 본문의 \usepackage 라인 제거
-    body = re.sub(r'\\usepackage(\[[^\]]*\])?\{[^}]*\}\n?', '', body)
+    new_body = _USEPACKAGE_RE.sub('', body)
+    if new_body is body:
+        return content
 
-    return preamble + body
+    return preamble + new_body
 
 
 def ensure_breaklines_in_lstset(content: str) -> str:
@@ -107,8 +136,7 @@ def ensure_breaklines_in_lstset(content: str) -> str:
         return content
 
     # lstset 내에 breaklines 추가
-    content = re.sub(
-        r'(\\lstset\{[^}]*)(frame=single)',
+    content = _LSTSET_FRAME_RE.sub(
         r'\1breaklines=true,\n    \2',
         content
     )
@@ -121,22 +149,14 @@ def fix_lstlisting_options(content: str) -> str:
     개별 lstlisting 환경에 breaklines=true 추가
     """
     # \begin{lstlisting} 에 옵션이 없는 경우
-    content = re.sub(
-        r'\\begin\{lstlisting\}(?!\[)',
+    content = _LSTLISTING_NOOPT.sub(
         r'\\begin{lstlisting}[breaklines=true]',
         content
     )
 
     # 이미 옵션이 있지만 breaklines가 없는 경우
-    def add_breaklines(match):
-        options = match.group(1)
-        if 'breaklines' not in options:
-            return f'\\begin{{lstlisting}}[{options}, breaklines=true]'
-        return match.group(0)
-
-    content = re.sub(
-        r'\\begin\{lstlisting\}\[([^\]]+)\]',
-        add_breaklines,
+    content = _LSTLISTING_OPT.sub(
+        r'\\begin{lstlisting}[\1, breaklines=true]',
         content
     )
 
@@ -167,19 +187,18 @@ def add_adjustbox_to_wide_tables(content: str) -> str:
 
     # 패턴: \begin{tabular}...\end{tabular}
     # 주의: 중첩 가능성 때문에 간단한 케이스만 처리
-    content = re.sub(
-        r'(\\begin\{tabular\}\{[^}]+\}.*?)(\\end\{tabular\})',
-        wrap_with_adjustbox,
-        content,
-        flags=re.DOTALL
-    )
+    content = _TABULAR_BLOCK.sub(wrap_with_adjustbox, content)
 
     return content
 
 
-def ensure_adjustbox_package(content: str) -> str:
+def ensure_adjustbox_package(content: str, doc_start: int) -> str:
     """
     adjustbox 패키지가 없으면 추가
+
+    Args:
+        content: 파일 내용
+        doc_start: \begin{document} 위치 (없으면 -1)
     """
     if '\\usepackage{adjustbox}' in content:
         return content
@@ -193,7 +212,6 @@ def ensure_adjustbox_package(content: str) -> str:
     # 또는 geometry 뒤에 추가
     elif '\\usepackage{geometry}' in content or '\\usepackage[' in content:
         # preamble 끝 부분에 추가
-        doc_start = content.find('\\begin{document}')
         if doc_start != -1:
             preamble = content[:doc_start]
             body = content[doc_start:]
@@ -204,42 +222,101 @@ def ensure_adjustbox_package(content: str) -> str:
     return content
 
 
-def fix_tex_file(file_path: Path) -> bool:
+def fix_tex_file(file_path: str) -> Optional[bool]:
     """
     단일 tex 파일 수정
+
+    Returns:
+        수정 여부 (처리 중 오류가 나면 None)
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # 대상 명령이 하나도 없으면 디코딩 없이 건너뜀
+        content = read_text_if_contains(file_path, _FIX_TRIGGERS)
+        if content is None:
+            return False
 
         original = content
 
+        # 대상 명령이 없는 파일은 해당 수정 단계를 건너뜀 (단순 문자열 검사)
+        has_tabular = 'tabular' in content
+        has_geometry = '\\geometry' in content
+        has_usepackage = '\\usepackage' in content
+
         # 1. 테이블 너비 수정
-        content = fix_table_widths(content)
+        if has_tabular:
+            content = fix_table_widths(content)
+
+        # \begin{document} 위치는 한 번만 찾음
+        # (2, 3단계는 이 위치 뒤쪽만 지우므로 위치가 바뀌지 않음)
+        doc_start = content.find('\\begin{document}')
 
         # 2. 중복 geometry 제거
-        content = remove_duplicate_geometry(content)
+        if has_geometry:
+            content = remove_duplicate_geometry(content, doc_start)
 
         # 3. 본문 내 중복 usepackage 제거
-        content = remove_duplicate_usepackage_in_body(content)
-
-        # 4. breaklines 확인
-        content = ensure_breaklines_in_lstset(content)
-        content = fix_lstlisting_options(content)
+        if has_usepackage:
+            content = remove_duplicate_usepackage_in_body(content, doc_start)
+
+        # 4. breaklines 확인 (\lstset과 \begin{lstlisting}은 따로 검사)
+        before_lst = content
+        if '\\lstset' in content:
+            content = ensure_breaklines_in_lstset(content)
+        if '\\begin{lstlisting}' in content:
+            content = fix_lstlisting_options(content)
+        # \lstset 수정은 preamble 길이를 바꾸므로 변경된 경우만 다시 찾음
+        if content is not before_lst:
+            doc_start = content.find('\\begin{document}')
 
         # 5. adjustbox 패키지 확인
-        content = ensure_adjustbox_package(content)
+        content = ensure_adjustbox_package(content, doc_start)
 
-        # 변경된 경우만 저장
-        if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        # 변경된 경우만 저장 (각 단계는 변경이 없으면 같은 객체를 반환)
+        if content is not original:
+            write_text_atomic(file_path, content)
             return True
         return False
 
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
-        return False
+        return None
+
+
+def cache_version() -> str:
+    """
+    수정 로직의 버전 (이 모듈과 src/utils.py 소스의 해시)
+    읽기/쓰기(줄바꿈 처리 등)를 포함한 수정 로직이 바뀌면 버전이 달라져 이전 캐시 전체를 버림
+    """
+    digest = hashlib.sha1()
+    for source in (Path(__file__), Path(__file__).with_name('utils.py')):
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def load_cache(cache_path: Path, version: str) -> Dict[str, List[int]]:
+    """
+    이전 실행의 (mtime_ns, size) 캐시 로드 (없거나 손상되었거나 버전이 다르면 빈 캐시)
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != version:
+        return {}
+    files = data.get('files')
+    return files if isinstance(files, dict) else {}
+
+
+def save_cache(cache_path: Path, cache: Dict[str, List[int]], version: str):
+    """
+    (mtime_ns, size) 캐시를 수정 로직 버전과 함께 저장
+    """
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'files': cache}, f, indent=0, sort_keys=True)
+    except OSError as e:
+        print(f"Error writing cache {cache_path}: {e}")
 
 
 def process_all_tex_files():
@@ -250,24 +327,55 @@ def process_all_tex_files():
 
     schools = ["mit", "stanford", "harvard", "uiuc"]
 
-    total_files = 0
-    modified_files = 0
-
+    # 모든 tex 파일 찾기
+    tex_files = []
     for school in schools:
         school_dir = base_dir / school
-        if not school_dir.exists():
-            continue
-
-        print(f"\n{'='*60}")
-        print(f"Processing: {school.upper()}")
-        print(f"{'='*60}")
-
-        # 모든 tex 파일 찾기
-        for tex_file in school_dir.rglob("*.tex"):
-            total_files += 1
-            if fix_tex_file(tex_file):
-                print(f"  Modified: {tex_file.relative_to(base_dir)}")
+        if school_dir.exists():
+            tex_files.extend(iter_tex(str(school_dir)))
+
+    total_files = len(tex_files)
+    modified_files = 0
+
+    # 지난 실행 이후 mtime/크기가 그대로인 파일은 다시 처리하지 않음
+    # (수정 작업은 여러 번 실행해도 결과가 같음, 수정 로직이 바뀌면 전체를 다시 처리)
+    cache_path = base_dir / _CACHE_NAME
+    version = cache_version()
+    cache = load_cache(cache_path, version)
+    pending = []
+    for tex_file in tex_files:
+        key = os.path.relpath(tex_file, base_dir)
+        st = os.stat(tex_file)
+        if cache.get(key) != [st.st_mtime_ns, st.st_size]:
+            pending.append(tex_file)
+
+    print(f"\n{'='*60}")
+    print(f"Processing: {len(pending)} files ({total_files - len(pending)} unchanged, skipped)")
+    print(f"{'='*60}")
+
+    # 파일별로 독립적이므로 프로세스 풀에서 병렬 처리 (큰 파일부터 제출)
+    with ProcessPoolExecutor() as executor:
+        futures = {
+            executor.submit(fix_tex_file, tex_file): tex_file
+            for tex_file in largest_first(pending)
+        }
+        for future in as_completed(futures):
+            tex_file = futures[future]
+            key = os.path.relpath(tex_file, base_dir)
+            result = future.result()
+            if result is None:
+                # 오류가 난 파일은 다음 실행에서 다시 처리
+                cache.pop(key, None)
+                continue
+            if result:
+                print(f"  Modified: {key}")
                 modified_files += 1
+            st = os.stat(tex_file)
+            cache[key] = [st.st_mtime_ns, st.st_size]
+
+    # 삭제된 파일 항목 정리 후 저장
+    current = {os.path.relpath(tex_file, base_dir) for tex_file in tex_files}
+    save_cache(cache_path, {key: entry for key, entry in cache.items() if key in current}, version)
 
     print(f"\n{'='*60}")
     print(f"Summary: Modified {modified_files}/{total_files} files")
@@ -5,60 +5,75 @@ LaTeX에서 & 문자 이스케이프 수정
 - 그 외의 &는 \&로 변경
 """
 
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import iter_tex, largest_first, read_text_if_contains, write_text_atomic
+
+
+# & 를 그대로 두어야 하는 환경 (각 환경의 * 변형 포함)
+TABLE_ENVS = ['tabular', 'tabularx', 'longtable', 'array', 'matrix',
+              'pmatrix', 'bmatrix', 'vmatrix', 'align', 'eqnarray', 'cases']
+
+# \begin{env} / \end{env} / 이스케이프되지 않은 & 를 한 번에 찾는 패턴
+_SCAN = re.compile(
+    r'\\(begin|end)\{(?:' + '|'.join(TABLE_ENVS) + r')\*?\}'
+    r'|(?<!\\)&'
+)
+
 
 def escape_ampersand_outside_tables(content: str) -> str:
-    """테이블 환경 외부의 & 문자를 \&로 이스케이프"""
-    lines = content.split('\n')
-    result = []
+    """테이블 환경 외부의 & 문자를 \&로 이스케이프 (파일 전체 1회 스캔)"""
+    out = []
+    pos = 0
     in_table = 0  # 중첩된 테이블 환경 카운트
-
-    table_envs = ['tabular', 'tabularx', 'longtable', 'array', 'matrix',
-                  'pmatrix', 'bmatrix', 'vmatrix', 'align', 'align*',
-                  'eqnarray', 'eqnarray*', 'cases']
-
-    for line in lines:
-        # 테이블 환경 시작 감지
-        for env in table_envs:
-            if f'\\begin{{{env}}}' in line or f'\\begin{{{env}*}}' in line:
-                in_table += line.count(f'\\begin{{{env}}}')
-                in_table += line.count(f'\\begin{{{env}*}}')
-
-        # 테이블 환경이 아닐 때만 & 이스케이프
-        if in_table == 0:
-            # 이미 이스케이프된 \& 는 건드리지 않음
-            # & 앞에 \가 없는 경우만 치환
-            new_line = re.sub(r'(?<!\\)&', r'\\&', line)
-            result.append(new_line)
+    escaped = False
+
+    for m in _SCAN.finditer(content):
+        out.append(content[pos:m.start()])
+        kind = m.group(1)
+        if kind == 'begin':
+            in_table += 1
+            out.append(m.group(0))
+        elif kind == 'end':
+            in_table = max(0, in_table - 1)  # 음수 방지
+            out.append(m.group(0))
         else:
-            result.append(line)
-
-        # 테이블 환경 종료 감지
-        for env in table_envs:
-            if f'\\end{{{env}}}' in line or f'\\end{{{env}*}}' in line:
-                in_table -= line.count(f'\\end{{{env}}}')
-                in_table -= line.count(f'\\end{{{env}*}}')
+            # 테이블 환경이 아닐 때만 & 이스케이프
+            if in_table == 0:
+                out.append('\\&')
+                escaped = True
+            else:
+                out.append('&')
+        pos = m.end()
 
-        # 음수 방지
-        in_table = max(0, in_table)
+    # 변경이 없으면 원래 문자열을 그대로 반환 (호출 측에서 `is`로 변경 여부 확인)
+    if not escaped:
+        return content
 
-    return '\n'.join(result)
+    out.append(content[pos:])
+    return ''.join(out)
 
 
-def process_file(file_path: Path) -> bool:
+def process_file(file_path: str) -> bool:
     """단일 파일 처리"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # & 가 없으면 수정할 내용 없음 (디코딩 전에 바이트 단위로 확인)
+        content = read_text_if_contains(file_path, (b'&',))
+        if content is None:
+            return False
 
         original = content
         content = escape_ampersand_outside_tables(content)
 
-        if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        if content is not original:
+            write_text_atomic(file_path, content)
             return True
         return False
 
@@ -70,16 +85,20 @@ def process_file(file_path: Path) -> bool:
 def main():
     base_dir = Path("c:/Dev/academicnotes/school")
 
-    total = 0
+    # 큰 파일부터 처리해서 마지막에 남는 작업을 줄임
+    tex_files = largest_first(iter_tex(str(base_dir)))
     modified = 0
 
-    for tex_file in base_dir.rglob("*.tex"):
-        total += 1
-        if process_file(tex_file):
-            print(f"Fixed: {tex_file.relative_to(base_dir)}")
-            modified += 1
+    # 파일별로 독립적이므로 프로세스 풀에서 병렬 처리
+    # (큰 파일이 한 작업자에게 몰리지 않도록 한 파일씩 배분)
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(process_file, tex_files, chunksize=1)
+        for tex_file, fixed in zip(tex_files, results):
+            if fixed:
+                print(f"Fixed: {os.path.relpath(tex_file, base_dir)}")
+                modified += 1
 
-    print(f"\nTotal: {modified}/{total} files modified")
+    print(f"\nTotal: {modified}/{len(tex_files)} files modified")
 
 
 if __name__ == "__main__":
@@ -5,15 +5,91 @@ Academic Notes - LaTeX Error Fixer
 LaTeX 파일의 일반적인 컴파일 에러를 자동으로 수정합니다.
 """
 
+import io
+import os
 import re
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Set, Tuple
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.utils import print_header, print_separator
+from src.utils import iter_tex, largest_first, print_header, print_separator, write_text_atomic
+
+
+# 이미지 참조 패턴
+_IMAGE_RE = re.compile(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}', re.ASCII)
+
+# \documentclass 패턴
+_DOCCLASS_RE = re.compile(r'(\\documentclass(?:\[[^\]]*\])?\{[^}]+\})', re.ASCII)
+
+# 문자 단위 수정 (cite 태그, 미정의 색상, 잘못된 \end, Noto Mono)
+# 하나의 패턴으로 합쳐 파일을 한 번만 스캔
+# (한글 본문 전체를 대상으로 하므로 re.ASCII 없이 유니코드 매칭 유지)
+_INLINE_FIX_RE = re.compile(
+    r'(?P<cite_start>\[cite_start\])'
+    r'|(?P<cite_ref>\[cite:\s*[^\]]*\])'
+    r'|(?P<cite>\[cite\])'
+    r'|\\(?P<gray>color|textcolor)\{gray\}'
+    r'|\\end\{(?P<invalid_end>subsection|section|chapter)\}'
+    r'|(?P<noto_mono>Noto Mono)'
+)
+
+# 수정 종류별 요약 메시지 (출력 순서 유지)
+_INLINE_FIX_MESSAGES = {
+    'cite_start': r"제거됨: \[cite_start\] 태그",
+    'cite_ref': r"제거됨: \[cite:\s*[^\]]*\] 태그",
+    'cite': r"제거됨: \[cite\] 태그",
+    'color': r"대체됨: \\color\{gray\} → \\color{black!50}",
+    'textcolor': r"대체됨: \\textcolor\{gray\} → \\textcolor{black!50}",
+    'subsection': "제거됨: 잘못된 \\end{subsection} 명령",
+    'section': "제거됨: 잘못된 \\end{section} 명령",
+    'chapter': "제거됨: 잘못된 \\end{chapter} 명령",
+    'noto_mono': "대체됨: Noto Mono → Noto Sans Mono",
+}
+
+# 백틱 코드, 마크다운 굵게
+# (span이 겹칠 때 기존과 같은 결과가 나오도록 cite 제거 뒤에 백틱 → 굵게 순서로 따로 적용)
+_BACKTICK_RE = re.compile(r'`([^`]+)`')
+_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+
+_DOC_END_RE = re.compile(r'\\end\{document\}', re.ASCII)
+
+# 닫힘 여부를 확인할 환경 목록
+_TRACKED_ENVS = [
+    'warningbox', 'mybox', 'summarybox', 'infobox', 'cautionbox',
+    'examplebox', 'itemize', 'enumerate', 'tabular', 'table', 'figure'
+]
+_TRACKED_ENV_RE = re.compile(r'\\(begin|end)\{(' + '|'.join(_TRACKED_ENVS) + r')\}', re.ASCII)
+
+# 폰트 명령 패턴
+_FONT_COMMANDS = [
+    (cmd, re.compile(rf'{cmd}\{{[^}}]+\}}', re.ASCII))
+    for cmd in [
+        r'\\setmainfont',
+        r'\\setsansfont',
+        r'\\setmonofont',
+        r'\\setCJKmainfont',
+        r'\\setCJKsansfont',
+        r'\\setCJKmonofont',
+    ]
+]
+_HANGUL_FONT_COMMANDS = [
+    (cmd, re.compile(rf'{cmd}\{{[^}}]+\}}', re.ASCII))
+    for cmd in [
+        r'\\setmainhangulfont',
+        r'\\setsanshangulfont',
+        r'\\setmonohangulfont',
+    ]
+]
+
+# 수정 단계별 사전 검사 패턴 (일치하는 내용이 없으면 해당 단계를 건너뜀)
+_FONT_COMMAND_RE = re.compile(r'\\set(?:CJK)?(?:main|sans|mono)font\{', re.ASCII)
+_HANGUL_FONT_COMMAND_RE = re.compile(r'\\set(?:main|sans|mono)hangulfont\{', re.ASCII)
 
 
 class LaTeXErrorFixer:
@@ -28,6 +104,27 @@ class LaTeXErrorFixer:
         self.original_content = ""
         self.content = ""
         self.fixes_applied = []
+        self._dir_cache: Dict[Path, Set[str]] = {}
+
+    def _dir_names(self, directory: Path) -> Set[str]:
+        """
+        디렉토리 안의 파일명 목록을 반환합니다 (scandir 1회, 결과 캐시).
+
+        Args:
+            directory: 조회할 디렉토리
+
+        Returns:
+            파일명 집합 (os.path.normcase 적용)
+        """
+        names = self._dir_cache.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory) as it:
+                    names = {os.path.normcase(entry.name) for entry in it}
+            except OSError:
+                names = set()
+            self._dir_cache[directory] = names
+        return names
 
     def read_file(self) -> bool:
         """
@@ -53,51 +150,92 @@ class LaTeXErrorFixer:
             성공 여부
         """
         try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                f.write(self.content)
+            write_text_atomic(str(self.filepath), self.content)
             return True
         except Exception as e:
             print(f"❌ 파일 쓰기 실패: {e}")
             return False
 
-    def fix_cite_tags(self):
-        """[cite_start], [cite: ...] 등의 태그 제거"""
-        patterns = [
-            r'\[cite_start\]',
-            r'\[cite:\s*[^\]]*\]',
-            r'\[cite\]',
-        ]
+    def fix_inline_markup(self):
+        """
+        문자 단위 수정을 한 번의 스캔으로 적용
+        - [cite_start], [cite: ...], [cite] 태그 제거
+        - 미정의 색상 gray → black!50
+        - 잘못된 \\end{subsection} 등 주석 처리
+        - Noto Mono → Noto Sans Mono
+
+        한 번의 스캔이므로 각 태그는 원래 내용 기준으로 찾음
+        (cite 제거로 이어 붙은 텍스트는 다시 검사하지 않음).
+        Noto Mono 변경 여부('Noto Sans Mono'가 이미 있는지)도 cite 제거 전, 다른 수정보다
+        먼저 판단함 (이전에는 모든 수정 뒤의 내용 기준).
+        백틱/굵게 변환은 fix_backticks, fix_markdown_bold에서 따로 처리.
+        """
+        fired = set()
+        rename_noto = 'Noto Sans Mono' not in self.content
+
+        def dispatch(match: re.Match) -> str:
+            kind = match.lastgroup
+            if kind in ('cite_start', 'cite_ref', 'cite'):
+                fired.add(kind)
+                return ''
+            if kind == 'gray':
+                cmd = match.group('gray')
+                fired.add(cmd)
+                return f'\\{cmd}{{black!50}}'
+            if kind == 'invalid_end':
+                cmd = match.group('invalid_end')
+                fired.add(cmd)
+                return f'% \\end{{{cmd}}}  % Invalid command removed'
+            if kind == 'noto_mono' and rename_noto:
+                fired.add(kind)
+                return 'Noto Sans Mono'
+            return match.group(0)
+
+        self.content = _INLINE_FIX_RE.sub(dispatch, self.content)
+        self.fixes_applied.extend(
+            message for kind, message in _INLINE_FIX_MESSAGES.items() if kind in fired
+        )
+
+    def fix_backticks(self):
+        """백틱(`) 문자를 LaTeX 명령으로 변경"""
+        new_content = _BACKTICK_RE.sub(r'\\texttt{\1}', self.content)
+        if new_content is not self.content:
+            self.content = new_content
+            self.fixes_applied.append("변경됨: 백틱(`) → \\texttt{}")
 
-        for pattern in patterns:
-            if re.search(pattern, self.content):
-                self.content = re.sub(pattern, '', self.content)
-                self.fixes_applied.append(f"제거됨: {pattern} 태그")
+    def fix_markdown_bold(self):
+        """마크다운 굵게(**text**) → LaTeX 굵게"""
+        new_content = _BOLD_RE.sub(r'\\textbf{\1}', self.content)
+        if new_content is not self.content:
+            self.content = new_content
+            self.fixes_applied.append("변경됨: **text** → \\textbf{text}")
 
     def fix_nonexistent_images(self):
         """존재하지 않는 이미지 참조 주석 처리"""
-        # \includegraphics 명령 찾기
-        image_pattern = r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}'
-        matches = list(re.finditer(image_pattern, self.content))
-
-        for match in reversed(matches):  # 뒤에서부터 처리 (인덱스 유지)
+        def comment_missing(match: re.Match) -> str:
             image_path = match.group(1)
             full_path = self.filepath.parent / image_path
 
+            # 같은 폴더의 이미지가 많으므로 폴더 목록을 한 번만 읽어서 확인
+            names = self._dir_names(full_path.parent)
+            name = os.path.normcase(full_path.name)
+
             # 확장자가 없으면 일반적인 확장자 시도
             if not full_path.suffix:
                 possible_extensions = ['.png', '.jpg', '.jpeg', '.pdf', '.eps']
-                exists = any((self.filepath.parent / (image_path + ext)).exists()
-                           for ext in possible_extensions)
+                exists = any(name + ext in names for ext in possible_extensions)
             else:
-                exists = full_path.exists()
+                exists = name in names
+
+            if exists:
+                return match.group(0)
 
-            if not exists:
-                # 주석 처리
-                start, end = match.span()
-                original = self.content[start:end]
-                commented = f'% {original}  % Image not found: {image_path}'
-                self.content = self.content[:start] + commented + self.content[end:]
-                self.fixes_applied.append(f"주석 처리됨: 존재하지 않는 이미지 {image_path}")
+            # 주석 처리
+            self.fixes_applied.append(f"주석 처리됨: 존재하지 않는 이미지 {image_path}")
+            return f'% {match.group(0)}  % Image not found: {image_path}'
+
+        # \includegraphics 명령을 한 번에 치환 (파일 전체 복사는 1회)
+        self.content = _IMAGE_RE.sub(comment_missing, self.content)
 
     def fix_undefined_colors(self):
         """미정의 색상 사용 수정"""
@@ -107,69 +245,38 @@ class LaTeXErrorFixer:
 
         if not has_xcolor:
             # xcolor 패키지 추가
-            # \documentclass 다음에 추가
-            doc_class_pattern = r'(\\documentclass(?:\[[^\]]*\])?\{[^}]+\})'
-            if re.search(doc_class_pattern, self.content):
-                self.content = re.sub(
-                    doc_class_pattern,
-                    r'\1\n\\usepackage{xcolor}  % Auto-added for color support',
-                    self.content,
-                    count=1
-                )
+            # \documentclass 다음에 추가 (일치하지 않으면 sub가 같은 객체를 반환)
+            new_content = _DOCCLASS_RE.sub(
+                r'\1\n\\usepackage{xcolor}  % Auto-added for color support',
+                self.content,
+                count=1
+            )
+            if new_content is not self.content:
+                self.content = new_content
                 self.fixes_applied.append("추가됨: xcolor 패키지")
 
-        # 미정의 색상을 정의된 색상으로 변경
-        color_replacements = {
-            r'\\color\{gray\}': r'\\color{black!50}',
-            r'\\textcolor\{gray\}': r'\\textcolor{black!50}',
-        }
-
-        for old, new in color_replacements.items():
-            if re.search(old, self.content):
-                self.content = re.sub(old, new, self.content)
-                self.fixes_applied.append(f"대체됨: {old} → {new}")
-
-    def fix_backticks(self):
-        """백틱(`) 문자를 LaTeX 명령으로 변경"""
-        # 코드 블록 외부의 백틱 찾기 (간단한 버전)
-        backtick_pattern = r'`([^`]+)`'
-
-        if re.search(backtick_pattern, self.content):
-            self.content = re.sub(backtick_pattern, r'\\texttt{\1}', self.content)
-            self.fixes_applied.append("변경됨: 백틱(`) → \\texttt{}")
-
-    def fix_markdown_bold(self):
-        """마크다운 굵게(**text**) → LaTeX 굵게"""
-        bold_pattern = r'\*\*([^*]+)\*\*'
-
-        if re.search(bold_pattern, self.content):
-            self.content = re.sub(bold_pattern, r'\\textbf{\1}', self.content)
-            self.fixes_applied.append("변경됨: **text** → \\textbf{text}")
+        # 미정의 색상(gray) 변경은 fix_inline_markup에서 처리
 
     def fix_unclosed_environments(self):
         """닫히지 않은 환경 수정"""
         # 문서 끝 위치 찾기
-        doc_end_match = re.search(r'\\end\{document\}', self.content)
+        doc_end_match = _DOC_END_RE.search(self.content)
         if not doc_end_match:
             return
 
         doc_end_pos = doc_end_match.start()
         content_before_end = self.content[:doc_end_pos]
 
-        # 확인할 환경 목록
-        environments = [
-            'warningbox', 'mybox', 'summarybox', 'infobox', 'cautionbox',
-            'examplebox', 'itemize', 'enumerate', 'tabular', 'table', 'figure'
-        ]
+        # \begin / \end 개수를 한 번의 스캔으로 집계
+        counts = Counter(
+            (m.group(2), m.group(1)) for m in _TRACKED_ENV_RE.finditer(content_before_end)
+        )
 
         missing_ends = []
 
-        for env in environments:
-            begin_pattern = rf'\\begin\{{{env}\}}'
-            end_pattern = rf'\\end\{{{env}\}}'
-
-            opens = len(re.findall(begin_pattern, content_before_end))
-            closes = len(re.findall(end_pattern, content_before_end))
+        for env in _TRACKED_ENVS:
+            opens = counts[(env, 'begin')]
+            closes = counts[(env, 'end')]
 
             if opens > closes:
                 missing_count = opens - closes
@@ -182,69 +289,36 @@ class LaTeXErrorFixer:
             self.content = self.content[:doc_end_pos] + insert_text + self.content[doc_end_pos:]
             self.fixes_applied.append(f"닫힘: {len(missing_ends)}개 환경 ({', '.join(set(missing_ends))})")
 
-    def fix_invalid_commands(self):
-        """잘못된 LaTeX 명령 수정"""
-        # \\end{subsection} 같은 잘못된 명령 제거
-        invalid_ends = ['subsection', 'section', 'chapter']
-
-        for cmd in invalid_ends:
-            pattern = rf'\\end\{{{cmd}\}}'
-            if re.search(pattern, self.content):
-                self.content = re.sub(
-                    pattern,
-                    rf'% \\end{{{cmd}}}  % Invalid command removed',
-                    self.content
-                )
-                self.fixes_applied.append(f"제거됨: 잘못된 \\end{{{cmd}}} 명령")
-
     def fix_duplicate_commands(self):
         """중복된 명령 제거 (예: 중복된 \\setmonofont)"""
-        font_commands = [
-            r'\\setmainfont',
-            r'\\setsansfont',
-            r'\\setmonofont',
-            r'\\setCJKmainfont',
-            r'\\setCJKsansfont',
-            r'\\setCJKmonofont',
-        ]
+        for cmd, pattern in _FONT_COMMANDS:
+            seen = 0
 
-        for cmd in font_commands:
-            pattern = rf'{cmd}\{{[^}}]+\}}'
-            matches = list(re.finditer(pattern, self.content))
+            def comment_duplicate(match: re.Match) -> str:
+                nonlocal seen
+                seen += 1
+                if seen == 1:
+                    return match.group(0)  # 첫 번째는 유지
+                return f'% {match.group(0)}  % Duplicate removed'
 
-            if len(matches) > 1:
-                # 첫 번째를 제외한 나머지 주석 처리
-                for match in reversed(matches[1:]):
-                    start, end = match.span()
-                    original = self.content[start:end]
-                    commented = f'% {original}  % Duplicate removed'
-                    self.content = self.content[:start] + commented + self.content[end:]
+            self.content = pattern.sub(comment_duplicate, self.content)
 
-                self.fixes_applied.append(f"제거됨: 중복된 {cmd} 명령 {len(matches)-1}개")
+            if seen > 1:
+                self.fixes_applied.append(f"제거됨: 중복된 {cmd} 명령 {seen-1}개")
 
     def fix_font_issues(self):
         """폰트 관련 문제 수정"""
-        # Noto Mono → Noto Sans Mono
-        if 'Noto Mono' in self.content and 'Noto Sans Mono' not in self.content:
-            self.content = self.content.replace('Noto Mono', 'Noto Sans Mono')
-            self.fixes_applied.append("대체됨: Noto Mono → Noto Sans Mono")
+        # Noto Mono → Noto Sans Mono 변경은 fix_inline_markup에서 처리
 
         # 미지원 hangul 폰트 명령 주석 처리 (xeCJK 없이 사용된 경우)
         if '\\usepackage{xeCJK}' not in self.content and '\\usepackage{kotex}' not in self.content:
-            hangul_cmds = [
-                r'\\setmainhangulfont',
-                r'\\setsanshangulfont',
-                r'\\setmonohangulfont',
-            ]
-
-            for cmd in hangul_cmds:
-                pattern = rf'{cmd}\{{[^}}]+\}}'
-                if re.search(pattern, self.content):
-                    self.content = re.sub(
-                        pattern,
-                        lambda m: f'% {m.group(0)}  % Requires xeCJK or kotex',
-                        self.content
-                    )
+            for cmd, pattern in _HANGUL_FONT_COMMANDS:
+                new_content = pattern.sub(
+                    lambda m: f'% {m.group(0)}  % Requires xeCJK or kotex',
+                    self.content
+                )
+                if new_content is not self.content:
+                    self.content = new_content
                     self.fixes_applied.append(f"주석 처리됨: {cmd} (xeCJK/kotex 필요)")
 
     def fix_special_characters(self):
@@ -262,20 +336,27 @@ class LaTeXErrorFixer:
         """모든 수정 적용"""
         self.fixes_applied = []
 
-        self.fix_cite_tags()
-        self.fix_nonexistent_images()
-        self.fix_undefined_colors()
-        self.fix_backticks()
-        self.fix_markdown_bold()
-        self.fix_invalid_commands()
-        self.fix_duplicate_commands()
-        self.fix_font_issues()
-        self.fix_unclosed_environments()  # 마지막에 실행
+        # (사전 검사 패턴, 수정 함수) 순서대로 적용
+        # 검사 패턴이 현재 내용에 없으면 수정 함수(전체 치환)를 실행하지 않음
+        pipeline = [
+            (_INLINE_FIX_RE, self.fix_inline_markup),
+            (_IMAGE_RE, self.fix_nonexistent_images),
+            (_DOCCLASS_RE, self.fix_undefined_colors),
+            (_BACKTICK_RE, self.fix_backticks),
+            (_BOLD_RE, self.fix_markdown_bold),
+            (_FONT_COMMAND_RE, self.fix_duplicate_commands),
+            (_HANGUL_FONT_COMMAND_RE, self.fix_font_issues),
+            (_DOC_END_RE, self.fix_unclosed_environments),  # 마지막에 실행
+        ]
+        for pattern, fix in pipeline:
+            if pattern.search(self.content):
+                fix()
+
         self.fix_special_characters()
 
     def has_changes(self) -> bool:
         """내용이 변경되었는지 확인"""
-        return self.content != self.original_content
+        return self.content is not self.original_content and self.content != self.original_content
 
     def get_summary(self) -> str:
         """수정 요약 반환"""
@@ -320,6 +401,19 @@ def fix_latex_file(filepath: Path, verbose: bool = True) -> bool:
         return False
 
 
+def _fix_latex_file_captured(filepath: Path) -> Tuple[bool, str]:
+    """
+    fix_latex_file을 실행하고 출력을 모아서 반환합니다 (프로세스 풀 작업용).
+
+    Returns:
+        (수정 여부, 출력 문자열) 튜플
+    """
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        fixed = fix_latex_file(filepath)
+    return fixed, buffer.getvalue()
+
+
 def main():
     """메인 함수"""
     import argparse
@@ -351,7 +445,7 @@ def main():
         tex_files = [target_path]
     elif target_path.is_dir():
         if args.recursive:
-            tex_files = list(target_path.rglob('*.tex'))
+            tex_files = [Path(p) for p in iter_tex(str(target_path))]
         else:
             tex_files = list(target_path.glob('*.tex'))
     else:
@@ -365,11 +459,19 @@ def main():
     print(f"\n발견된 .tex 파일: {len(tex_files)}개")
     print_separator(width=70)
 
-    # 각 파일 수정
+    # 각 파일 수정 (파일별로 독립적이므로 프로세스 풀에서 병렬 처리)
+    # 작업은 큰 파일부터 제출하고, 출력은 파일명 순서대로 모아서 표시
     fixed_count = 0
-    for tex_file in sorted(tex_files):
-        if fix_latex_file(tex_file):
-            fixed_count += 1
+    with ProcessPoolExecutor() as executor:
+        futures = {
+            filepath: executor.submit(_fix_latex_file_captured, filepath)
+            for filepath in largest_first(tex_files)
+        }
+        for filepath in sorted(tex_files):
+            fixed, output = futures[filepath].result()
+            sys.stdout.write(output)
+            if fixed:
+                fixed_count += 1
 
     # 결과 요약
     print_separator(width=70)
@@ -5,50 +5,64 @@ tabular/tabularx 불일치 수정 스크립트
 - \begin{tabularx}로 시작하면 \end{tabularx}로 끝나야 함
 """
 
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import iter_tex, largest_first, read_text_if_contains, write_text_atomic
+
+
+# \begin{tabular}, \begin{tabularx}, \end{tabular}, \end{tabularx}
+_TABLE_TAG_RE = re.compile(r'\\(begin|end)\{(tabularx?)\}', re.ASCII)
+
 
 def fix_table_mismatch(content: str) -> str:
-    """tabular/tabularx 불일치 수정"""
-    lines = content.split('\n')
-    result = []
+    """tabular/tabularx 불일치 수정 (줄 단위 분할 없이 파일 전체 1회 스캔)"""
     table_stack = []  # 열린 테이블 환경 추적
+    out = []
+    pos = 0
 
-    for i, line in enumerate(lines):
-        # tabular 시작 감지
-        if '\\begin{tabular}' in line and '\\begin{tabularx}' not in line:
-            table_stack.append('tabular')
-        elif '\\begin{tabularx}' in line:
-            table_stack.append('tabularx')
+    for m in _TABLE_TAG_RE.finditer(content):
+        kind, env = m.group(1), m.group(2)
+        if kind == 'begin':
+            table_stack.append(env)
+            continue
+        if not table_stack:
+            continue
 
-        # 닫는 태그 수정
-        if '\\end{tabular}' in line and table_stack:
-            if table_stack[-1] == 'tabularx':
-                line = line.replace('\\end{tabular}', '\\end{tabularx}')
-            table_stack.pop()
-        elif '\\end{tabularx}' in line and table_stack:
-            if table_stack[-1] == 'tabular':
-                line = line.replace('\\end{tabularx}', '\\end{tabular}')
-            table_stack.pop()
+        # 닫는 태그를 가장 최근에 열린 환경에 맞춤
+        expected = table_stack.pop()
+        if env != expected:
+            out.append(content[pos:m.start()])
+            out.append(f'\\end{{{expected}}}')
+            pos = m.end()
 
-        result.append(line)
+    # 변경이 없으면 원래 문자열을 그대로 반환 (호출 측에서 `is`로 변경 여부 확인)
+    if not out:
+        return content
 
-    return '\n'.join(result)
+    out.append(content[pos:])
+    return ''.join(out)
 
 
-def process_file(file_path: Path) -> bool:
+def process_file(file_path: str) -> bool:
     """단일 파일 처리"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # 테이블이 없으면 수정할 내용 없음 (디코딩 전에 바이트 단위로 확인)
+        content = read_text_if_contains(file_path, (b'tabular',))
+        if content is None:
+            return False
 
         original = content
         content = fix_table_mismatch(content)
 
-        if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        if content is not original:
+            write_text_atomic(file_path, content)
             return True
         return False
 
@@ -60,16 +74,20 @@ def process_file(file_path: Path) -> bool:
 def main():
     base_dir = Path("c:/Dev/academicnotes/school")
 
-    total = 0
+    # 큰 파일부터 처리해서 마지막에 남는 작업을 줄임
+    tex_files = largest_first(iter_tex(str(base_dir)))
     modified = 0
 
-    for tex_file in base_dir.rglob("*.tex"):
-        total += 1
-        if process_file(tex_file):
-            print(f"Fixed: {tex_file.relative_to(base_dir)}")
-            modified += 1
+    # 파일별로 독립적이므로 프로세스 풀에서 병렬 처리
+    # (큰 파일이 한 작업자에게 몰리지 않도록 한 파일씩 배분)
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(process_file, tex_files, chunksize=1)
+        for tex_file, fixed in zip(tex_files, results):
+            if fixed:
+                print(f"Fixed: {os.path.relpath(tex_file, base_dir)}")
+                modified += 1
 
-    print(f"\nTotal: {modified}/{total} files modified")
+    print(f"\nTotal: {modified}/{len(tex_files)} files modified")
 
 
 if __name__ == "__main__":
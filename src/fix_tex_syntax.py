@@ -6,23 +6,56 @@ LaTeX 문법 오류 수정 스크립트
 - 기타 문법 오류 수정
 """
 
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def fix_markdown_bold(content: str) -> str:
-    """**text** → \textbf{text} 변환"""
-    # **text** 패턴을 \textbf{text}로 변환
-    # 단, 이미 \textbf 안에 있거나 수식 안의 ** (지수)는 제외
+from src.utils import iter_tex, largest_first, read_text_if_contains, write_text_atomic
 
-    def replace_bold(match):
-        text = match.group(1)
-        return f'\\textbf{{{text}}}'
 
-    # **로 시작하고 **로 끝나는 텍스트 (최소 매칭)
-    content = re.sub(r'\*\*([^*]+)\*\*', replace_bold, content)
+# 문자 단위 수정 (**text**, 단독 줄의 --- 구분선)
+# 하나의 패턴으로 합쳐 파일을 한 번만 스캔
+_LOCAL_FIX_RE = re.compile(
+    r'\*\*(?P<bold>[^*]+)\*\*'
+    r'|(?P<triple_dash>\n---\n)'
+)
 
-    return content
+# \tcbuselibrary{...}
+_TCBUSELIBRARY_RE = re.compile(r'\\tcbuselibrary\{([^}]+)\}')
+
+# \documentclass 줄
+_DOCCLASS_RE = re.compile(r'(\\documentclass[^\n]*\n)')
+
+# tabularx 블록과 블록 내 첫 번째 \hline
+_TABULARX_BLOCK_RE = re.compile(r'\\begin\{tabularx\}.*?\\end\{tabularx\}', re.DOTALL)
+_FIRST_HLINE_RE = re.compile(r'\\hline\s*\n')
+
+# fix_tex_file의 수정 단계가 반응하는 문자열
+# (--- 는 줄바꿈 정규화 전의 \r\n 파일도 잡도록 줄바꿈 없이 검사)
+_FIX_TRIGGERS = (b'**', b'\\begin{tabularx}', b'---', b'tcolorbox', b'\\tcbuselibrary{')
+
+
+def fix_local_markup(content: str) -> str:
+    """
+    문자 단위 수정을 한 번의 스캔으로 적용
+    - **text** → \textbf{text} 변환
+    - --- (마크다운 구분선) → \hrule
+    """
+    def dispatch(match: re.Match) -> str:
+        if match.lastgroup == 'bold':
+            # 안쪽에는 *가 없으므로 구분선이 있을 때만 다시 스캔
+            inner = match.group('bold')
+            if '\n---\n' in inner:
+                inner = _LOCAL_FIX_RE.sub(dispatch, inner)
+            return f'\\textbf{{{inner}}}'
+        return '\n\\vspace{0.5cm}\\hrule\\vspace{0.5cm}\n'
+
+    return _LOCAL_FIX_RE.sub(dispatch, content)
 
 
 def ensure_tabularx_package(content: str) -> str:
@@ -48,11 +81,7 @@ def ensure_tabularx_package(content: str) -> str:
         )
     else:
         # documentclass 다음에 추가
-        content = re.sub(
-            r'(\\documentclass[^\n]*\n)',
-            r'\1\\usepackage{tabularx}\n',
-            content
-        )
+        content = _DOCCLASS_RE.sub(r'\1\\usepackage{tabularx}\n', content)
 
     return content
 
@@ -65,32 +94,17 @@ def fix_hline_in_tabularx(content: str) -> str:
     def fix_tabularx_block(match):
         block = match.group(0)
         # 첫 번째 \hline → \toprule
-        block = re.sub(r'\\hline\s*\n', '\\toprule\n', block, count=1)
-        # 마지막 \hline → \bottomrule (역순으로)
-        lines = block.split('\n')
-        for i in range(len(lines)-1, -1, -1):
-            if '\\hline' in lines[i]:
-                lines[i] = lines[i].replace('\\hline', '\\bottomrule')
-                break
-        block = '\n'.join(lines)
+        block = _FIRST_HLINE_RE.sub('\\toprule\n', block, count=1)
+        # 마지막 \hline → \bottomrule (뒤에서부터 찾아서 그 위치만 교체)
+        idx = block.rfind('\\hline')
+        if idx != -1:
+            block = block[:idx] + '\\bottomrule' + block[idx + len('\\hline'):]
         # 나머지 \hline → \midrule
         block = block.replace('\\hline', '\\midrule')
         return block
 
-    content = re.sub(
-        r'\\begin\{tabularx\}.*?\\end\{tabularx\}',
-        fix_tabularx_block,
-        content,
-        flags=re.DOTALL
-    )
-
-    return content
-
+    content = _TABULARX_BLOCK_RE.sub(fix_tabularx_block, content)
 
-def fix_triple_dash(content: str) -> str:
-    """--- (마크다운 구분선) → \hrule 또는 제거"""
-    # 단독 줄의 --- 제거 또는 \hrule로 변환
-    content = re.sub(r'\n---\n', '\n\\\\vspace{0.5cm}\\\\hrule\\\\vspace{0.5cm}\n', content)
     return content
 
 
@@ -101,12 +115,9 @@ def add_breakable_to_tcolorbox(content: str) -> str:
         return content
 
     # tcbuselibrary가 있으면 breakable 추가
+    # (파일 어디에도 breakable이 없으므로 모든 \tcbuselibrary{...}가 대상 → 콜백 없이 역참조로 치환)
     if '\\tcbuselibrary{' in content:
-        content = re.sub(
-            r'\\tcbuselibrary\{([^}]+)\}',
-            lambda m: f'\\tcbuselibrary{{{m.group(1)}, breakable}}' if 'breakable' not in m.group(1) else m.group(0),
-            content
-        )
+        content = _TCBUSELIBRARY_RE.sub(r'\\tcbuselibrary{\1, breakable}', content)
     elif '\\usepackage[most]{tcolorbox}' in content:
         content = content.replace(
             '\\usepackage[most]{tcolorbox}',
@@ -121,30 +132,33 @@ def add_breakable_to_tcolorbox(content: str) -> str:
     return content
 
 
-def fix_tex_file(file_path: Path) -> bool:
+def fix_tex_file(file_path: str) -> bool:
     """단일 tex 파일 수정"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # 대상 문자열이 하나도 없으면 디코딩 없이 건너뜀 (한 번에 읽어서 바이트 단위로 확인)
+        content = read_text_if_contains(file_path, _FIX_TRIGGERS)
+        if content is None:
+            return False
 
         original = content
 
-        # 1. **text** → \textbf{text}
-        content = fix_markdown_bold(content)
+        # 대상 문자열이 없는 파일은 해당 수정 단계를 건너뜀 (단순 문자열 검사)
 
-        # 2. tabularx 패키지 확인
-        content = ensure_tabularx_package(content)
+        # 1. **text** → \textbf{text}, --- 구분선 (한 번의 스캔)
+        if '**' in content or '\n---\n' in content:
+            content = fix_local_markup(content)
 
-        # 3. --- 구분선 수정
-        content = fix_triple_dash(content)
+        # 2. tabularx 패키지 확인
+        if '\\begin{tabularx}' in content:
+            content = ensure_tabularx_package(content)
 
-        # 4. tcolorbox breakable 추가
-        content = add_breakable_to_tcolorbox(content)
+        # 3. tcolorbox breakable 추가
+        if 'tcolorbox' in content or '\\tcbuselibrary{' in content:
+            content = add_breakable_to_tcolorbox(content)
 
         # 변경사항이 있으면 저장
         if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_text_atomic(file_path, content)
             return True
         return False
 
@@ -158,25 +172,32 @@ def main():
 
     schools = ["mit", "stanford", "harvard", "uiuc"]
 
-    total = 0
-    modified = 0
-
+    # 모든 tex 파일 찾기 (unified 파일은 건너뜀)
+    tex_files = []
     for school in schools:
         school_dir = base_dir / school
-        if not school_dir.exists():
-            continue
-
-        print(f"\n{'='*60}")
-        print(f"Processing: {school.upper()}")
-        print(f"{'='*60}")
-
-        for tex_file in school_dir.rglob("*.tex"):
-            # unified 파일은 건너뜀
-            if '_unified' in tex_file.name:
-                continue
-            total += 1
-            if fix_tex_file(tex_file):
-                print(f"  Fixed: {tex_file.relative_to(base_dir)}")
+        if school_dir.exists():
+            tex_files.extend(
+                p for p in iter_tex(str(school_dir))
+                if '_unified' not in os.path.basename(p)
+            )
+
+    total = len(tex_files)
+    modified = 0
+
+    print(f"\n{'='*60}")
+    print(f"Processing: {total} files")
+    print(f"{'='*60}")
+
+    # 파일별로 독립적이므로 프로세스 풀에서 병렬 처리 (큰 파일부터 제출)
+    with ProcessPoolExecutor() as executor:
+        futures = {
+            executor.submit(fix_tex_file, tex_file): tex_file
+            for tex_file in largest_first(tex_files)
+        }
+        for future in as_completed(futures):
+            if future.result():
+                print(f"  Fixed: {os.path.relpath(futures[future], base_dir)}")
                 modified += 1
 
     print(f"\n{'='*60}")
@@ -1,30 +1,63 @@
 #!/usr/bin/env python3
 """Merge PDFs into integrated documents."""
 
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, redirect_stdout
 from pathlib import Path
-import glob
 
 try:
-    from PyPDF2 import PdfMerger
+    import pikepdf
 except ImportError:
-    print("Installing PyPDF2...")
-    import subprocess
-    subprocess.run(['pip', 'install', 'PyPDF2'], capture_output=True)
-    from PyPDF2 import PdfMerger
+    sys.exit("pikepdf is required: pip install pikepdf")
+
+# (title, file name prefix, output name)
+_ENGLISH_BUNDLES = [
+    ("CS109A Complete English PDF", "CS109A_Lecture_", "CS109A_Complete_EN.pdf"),
+    ("CSCI103 Complete English PDF", "CSCI103_Lecture_", "CSCI103_Complete_EN.pdf"),
+    ("CSCI89 Complete English PDF", "CSCI89_Lecture_", "CSCI89_Complete_EN.pdf"),
+]
+_KOREAN_BUNDLES = [
+    ("CS109A Complete Korean PDF", "CS109A_Lecture_", "CS109A_Complete_KR.pdf"),
+    ("CSCI103 Complete Korean PDF", "CSCI103_Lecture_", "CSCI103_Complete_KR.pdf"),
+    ("CSCI89 Complete Korean PDF", "CSCI89_lecture_", "CSCI89_Complete_KR.pdf"),
+]
 
 def merge_pdfs(pdf_files, output_path):
     """Merge multiple PDFs into one."""
-    merger = PdfMerger()
-    for pdf in sorted(pdf_files):
-        try:
-            print(f"  Adding: {Path(pdf).name}")
-            merger.append(pdf)
-        except Exception as e:
-            print(f"  SKIPPED (error): {Path(pdf).name} - {e}")
-    merger.write(output_path)
-    merger.close()
+    # pikepdf (qpdf) copies page objects natively; source PDFs must stay open until save
+    with ExitStack() as stack:
+        merged = stack.enter_context(pikepdf.Pdf.new())
+        for pdf in sorted(pdf_files):
+            try:
+                print(f"  Adding: {Path(pdf).name}")
+                src = stack.enter_context(pikepdf.Pdf.open(pdf))
+                merged.pages.extend(src.pages)
+            except Exception as e:
+                print(f"  SKIPPED (error): {Path(pdf).name} - {e}")
+        merged.save(output_path, linearize=False)
     print(f"Created: {output_path}")
 
+def _list_pdfs(directory):
+    """Return the sorted names of the PDF files in a directory (empty if missing)."""
+    try:
+        with os.scandir(directory) as it:
+            return sorted(entry.name for entry in it
+                          if os.path.normcase(entry.name).endswith('.pdf') and entry.is_file())
+    except OSError:
+        return []
+
+def _merge_job(job):
+    """Run one merge job in a worker process and return its captured output."""
+    title, pdf_files, output_path = job
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        print(f"\n=== Creating {title} ===")
+        merge_pdfs(pdf_files, output_path)
+    return buffer.getvalue()
+
 def main():
     base_dir = Path("C:/Dev/academicnotes")
     output_dir = base_dir / "output"
@@ -34,42 +67,35 @@ def main():
     integrated_dir = output_dir / "integrated"
     integrated_dir.mkdir(exist_ok=True)
 
-    # CS109A English
-    print("\n=== Creating CS109A Complete English PDF ===")
-    cs109_files = sorted(english_dir.glob("CS109A_Lecture_*_EN.pdf"))
-    if cs109_files:
-        merge_pdfs(cs109_files, integrated_dir / "CS109A_Complete_EN.pdf")
+    # One directory read per folder, then bucket the names by prefix
+    english_pdfs = _list_pdfs(english_dir)
+    korean_pdfs = _list_pdfs(output_dir)
 
-    # CSCI103 English
-    print("\n=== Creating CSCI103 Complete English PDF ===")
-    csci103_files = sorted(english_dir.glob("CSCI103_Lecture_*_EN.pdf"))
-    if csci103_files:
-        merge_pdfs(csci103_files, integrated_dir / "CSCI103_Complete_EN.pdf")
-
-    # CSCI89 English
-    print("\n=== Creating CSCI89 Complete English PDF ===")
-    csci89_files = sorted(english_dir.glob("CSCI89_Lecture_*_EN.pdf"))
-    if csci89_files:
-        merge_pdfs(csci89_files, integrated_dir / "CSCI89_Complete_EN.pdf")
+    jobs = []
+    # Match names like glob does on Windows (case-insensitive there, via normcase)
+    en_suffix = os.path.normcase('_EN.pdf')
+    for title, prefix, output_name in _ENGLISH_BUNDLES:
+        prefix = os.path.normcase(prefix)
+        files = [english_dir / name for name in english_pdfs
+                 if os.path.normcase(name).startswith(prefix)
+                 and os.path.normcase(name).endswith(en_suffix)]
+        if files:
+            jobs.append((title, files, integrated_dir / output_name))
 
     # Korean PDFs (from main output folder)
-    print("\n=== Creating CS109A Complete Korean PDF ===")
-    cs109_kr = sorted(output_dir.glob("CS109A_Lecture_*.pdf"))
-    cs109_kr = [f for f in cs109_kr if "_EN" not in f.name and "Complete" not in f.name]
-    if cs109_kr:
-        merge_pdfs(cs109_kr, integrated_dir / "CS109A_Complete_KR.pdf")
-
-    print("\n=== Creating CSCI103 Complete Korean PDF ===")
-    csci103_kr = sorted(output_dir.glob("CSCI103_Lecture_*.pdf"))
-    csci103_kr = [f for f in csci103_kr if "_EN" not in f.name and "Complete" not in f.name]
-    if csci103_kr:
-        merge_pdfs(csci103_kr, integrated_dir / "CSCI103_Complete_KR.pdf")
+    for title, prefix, output_name in _KOREAN_BUNDLES:
+        prefix = os.path.normcase(prefix)
+        files = [output_dir / name for name in korean_pdfs
+                 if os.path.normcase(name).startswith(prefix)
+                 and "_EN" not in name and "Complete" not in name]
+        if files:
+            jobs.append((title, files, integrated_dir / output_name))
 
-    print("\n=== Creating CSCI89 Complete Korean PDF ===")
-    csci89_kr = sorted(output_dir.glob("CSCI89_lecture_*.pdf"))
-    csci89_kr = [f for f in csci89_kr if "_EN" not in f.name and "Complete" not in f.name]
-    if csci89_kr:
-        merge_pdfs(csci89_kr, integrated_dir / "CSCI89_Complete_KR.pdf")
+    # Each bundle is independent, so merge them in parallel (output printed in job order)
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+            for output in executor.map(_merge_job, jobs):
+                sys.stdout.write(output)
 
     print("\n=== Done! ===")
     print(f"Integrated PDFs created in: {integrated_dir}")
@@ -5,9 +5,11 @@ Academic Notes - Migration Script
 기존 파일들을 새로운 디렉토리 구조로 재배치합니다.
 """
 
+import os
 import sys
 import shutil
 import re
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
@@ -17,6 +19,18 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.utils import ProjectPaths, print_header, print_separator
 
 
+# 파일명에서 강의 번호를 찾는 패턴 (앞에 있는 패턴 우선)
+_LECTURE_PATTERNS = (
+    re.compile(r'day[\-_]?(\d+)'),      # day1, day-1, day_01
+    re.compile(r'lecture[\-_]?(\d+)'),  # lecture1, lecture-01
+    re.compile(r'^(\d+)[\.\-_]'),       # 01.txt, 1-1.tex
+    re.compile(r'[\-_](\d+)[\.\-_]'),   # cs109-01.tex, fin-574-1-1.tex
+)
+
+# 확장자별 분류 (그 외는 모두 'materials')
+_SUFFIX_BUCKETS = {'.tex': 'tex', '.pdf': 'pdf', '.txt': 'materials', '.md': 'materials'}
+
+
 class FileMigrator:
     """파일 마이그레이션 클래스"""
 
@@ -29,6 +43,22 @@ class FileMigrator:
         self.paths = project_paths or ProjectPaths()
         self.dry_run = dry_run
         self.migrations = []  # (source, dest) 튜플 리스트
+        self._root_prefix = str(self.paths.root) + os.sep
+
+    def _rel(self, path) -> str:
+        """
+        출력용 상대 경로 (프로젝트 루트 접두어만 잘라냄, Path.relative_to보다 가벼움)
+
+        Args:
+            path: 프로젝트 루트 아래의 경로
+
+        Returns:
+            루트 기준 상대 경로 문자열 (루트 밖이면 그대로)
+        """
+        path = str(path)
+        if path.startswith(self._root_prefix):
+            return path[len(self._root_prefix):]
+        return path
 
     def parse_lecture_number(self, filename: str) -> Optional[int]:
         """
@@ -41,15 +71,9 @@ class FileMigrator:
             강의 번호 또는 None
         """
         # 다양한 패턴 시도
-        patterns = [
-            r'day[\-_]?(\d+)',      # day1, day-1, day_01
-            r'lecture[\-_]?(\d+)',  # lecture1, lecture-01
-            r'^(\d+)[\.\-_]',       # 01.txt, 1-1.tex
-            r'[\-_](\d+)[\.\-_]',   # cs109-01.tex, fin-574-1-1.tex
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, filename.lower())
+        name = filename.lower()
+        for pattern in _LECTURE_PATTERNS:
+            match = pattern.search(name)
             if match:
                 return int(match.group(1))
 
@@ -98,35 +122,22 @@ class FileMigrator:
         if not course_path.exists():
             return {}
 
-        lectures = {}
+        lectures = defaultdict(lambda: {'tex': [], 'materials': [], 'pdf': []})
 
-        # 모든 파일 스캔
-        for item in course_path.rglob('*'):
-            if not item.is_file():
-                continue
+        # 모든 파일 스캔 (os.walk는 scandir의 파일 종류 정보를 사용하므로 파일마다 stat하지 않음)
+        for dirpath, _dirnames, filenames in os.walk(course_path):
+            for filename in filenames:
+                lecture_num = self.parse_lecture_number(filename)
+                if lecture_num is None:
+                    continue
 
-            lecture_num = self.parse_lecture_number(item.name)
-            if lecture_num is None:
-                continue
+                item = Path(dirpath, filename)
 
-            if lecture_num not in lectures:
-                lectures[lecture_num] = {
-                    'tex': [],
-                    'materials': [],
-                    'pdf': []
-                }
-
-            # 파일 타입별 분류
-            if item.suffix == '.tex':
-                lectures[lecture_num]['tex'].append(item)
-            elif item.suffix == '.pdf':
-                lectures[lecture_num]['pdf'].append(item)
-            elif item.suffix in ['.txt', '.md']:
-                lectures[lecture_num]['materials'].append(item)
-            else:
-                lectures[lecture_num]['materials'].append(item)
+                # 파일 타입별 분류
+                bucket = _SUFFIX_BUCKETS.get(item.suffix, 'materials')
+                lectures[lecture_num][bucket].append(item)
 
-        return lectures
+        return dict(lectures)
 
     def plan_migration(self, university: str, course: str) -> List[Tuple[Path, Path, str]]:
         """
@@ -141,6 +152,7 @@ class FileMigrator:
             operation: 'move_tex', 'move_material', 'move_pdf', 'skip'
         """
         lectures = self.scan_course_directory(university, course)
+        norm_course = self.normalize_course_code(course)
         plan = []
 
         for lecture_num, files in sorted(lectures.items()):
@@ -174,10 +186,10 @@ class FileMigrator:
                         plan.append((material, dest_material, 'move_material'))
 
             # PDF 파일 처리 (원본 슬라이드 등)
+            tex_names = {t.stem for t in files['tex']}
             for pdf in files['pdf']:
                 # .tex와 같은 이름의 PDF는 건너뛰기 (컴파일된 결과물)
-                tex_names = [t.stem for t in files['tex']]
-                if pdf.stem in tex_names or self.normalize_course_code(course) in pdf.stem.lower():
+                if pdf.stem in tex_names or norm_course in pdf.stem.lower():
                     continue
 
                 # materials로 이동
@@ -195,6 +207,15 @@ class FileMigrator:
         Args:
             plan: [(source, dest, operation)] 튜플 리스트
         """
+        # 디렉토리별 장치 번호 캐시 (같은 파일시스템이면 os.replace로 바로 이동)
+        dev_cache: Dict[Path, int] = {}
+
+        def device(directory: Path) -> int:
+            dev = dev_cache.get(directory)
+            if dev is None:
+                dev = dev_cache[directory] = os.stat(directory).st_dev
+            return dev
+
         for source, dest, operation in plan:
             # 대상 디렉토리 생성
             dest.parent.mkdir(parents=True, exist_ok=True)
@@ -203,9 +224,12 @@ class FileMigrator:
                 print(f"[DRY RUN] {operation}: {source} → {dest}")
             else:
                 try:
-                    # 파일 이동
-                    shutil.move(str(source), str(dest))
-                    print(f"✓ {operation}: {source.name} → {dest.relative_to(self.paths.root)}")
+                    # 파일 이동 (다른 파일시스템이면 shutil.move로 복사 후 삭제)
+                    if device(source.parent) == device(dest.parent):
+                        os.replace(source, dest)
+                    else:
+                        shutil.move(str(source), str(dest))
+                    print(f"✓ {operation}: {source.name} → {self._rel(dest)}")
                 except Exception as e:
                     print(f"✗ 실패: {source} → {dest}: {e}")
 
@@ -220,14 +244,21 @@ class FileMigrator:
             print(f"[DRY RUN] 빈 디렉토리 정리: {course_path}")
             return
 
-        # 하위 디렉토리부터 정리 (재귀적)
-        for item in sorted(course_path.rglob('*'), reverse=True):
-            if item.is_dir() and not any(item.iterdir()):
-                try:
-                    item.rmdir()
-                    print(f"🗑️  빈 디렉토리 삭제: {item.relative_to(self.paths.root)}")
-                except Exception as e:
-                    print(f"⚠️  디렉토리 삭제 실패: {item}: {e}")
+        # 하위 디렉토리부터 정리 (topdown=False: 자식 디렉토리를 부모보다 먼저 방문)
+        # 목록은 방문 전에 읽으므로, 방금 삭제한 하위 디렉토리만 남은 경우도 빈 디렉토리로 취급
+        root = os.fspath(course_path)
+        removed = set()
+        for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+            if dirpath == root or filenames:
+                continue
+            if any(os.path.join(dirpath, name) not in removed for name in dirnames):
+                continue
+            try:
+                os.rmdir(dirpath)
+                removed.add(dirpath)
+                print(f"🗑️  빈 디렉토리 삭제: {self._rel(dirpath)}")
+            except Exception as e:
+                print(f"⚠️  디렉토리 삭제 실패: {dirpath}: {e}")
 
     def migrate_course(self, university: str, course: str):
         """
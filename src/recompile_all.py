@@ -4,12 +4,23 @@
 모든 TEX 파일을 재컴파일하는 스크립트
 """
 
+import os
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import time
 
+# 프로젝트 루트를 Python 경로에 추가 (Windows 콘솔 인코딩 설정은 src.utils에서 처리)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.compile_latex import detect_output_filename
+
 def compile_file(tex_file):
-    """단일 TEX 파일 컴파일"""
+    """
+    단일 TEX 파일 컴파일
+    워커 스레드에서 실행되므로 직접 출력하지 않고 (성공 여부, 오류 메시지)를 반환
+    """
     try:
         result = subprocess.run(
             ['python', 'src/compile_latex.py', str(tex_file)],
@@ -18,13 +29,46 @@ def compile_file(tex_file):
             timeout=120,
             encoding='utf-8'
         )
-        return result.returncode == 0
+        return result.returncode == 0, None
     except Exception as e:
-        print(f"  ✗ 컴파일 실패: {e}")
-        return False
+        return False, f"  ✗ 컴파일 실패: {e}"
+
+def compile_group(tex_files):
+    """output 파일명이 같은 TEX 파일들을 순서대로 컴파일 (같은 PDF로 복사되므로 동시에 실행하지 않음)"""
+    return [(tex_file, *compile_file(tex_file)) for tex_file in tex_files]
+
+def is_up_to_date(tex_file):
+    """PDF가 TEX 파일과 materials 폴더의 파일보다 최신이면 True"""
+    try:
+        pdf_mtime = tex_file.with_suffix('.pdf').stat().st_mtime
+        if pdf_mtime < tex_file.stat().st_mtime:
+            return False
+    except OSError:
+        return False  # PDF가 없음
+
+    # 강의 폴더의 materials/ (이미지 등)도 의존 파일로 취급
+    try:
+        with os.scandir(tex_file.parent / 'materials') as it:
+            for entry in it:
+                if entry.is_file() and entry.stat().st_mtime > pdf_mtime:
+                    return False
+    except OSError:
+        pass  # materials 폴더 없음
+
+    return True
 
 def main():
     """메인 실행 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='모든 TEX 파일을 재컴파일합니다.')
+    parser.add_argument(
+        '-f', '--force',
+        action='store_true',
+        help='PDF가 최신이어도 모두 다시 컴파일'
+    )
+    args = parser.parse_args()
+
     base_path = Path("school")
 
     if not base_path.exists():
@@ -34,24 +78,49 @@ def main():
     # 모든 TEX 파일 찾기
     tex_files = sorted(base_path.glob("**/*.tex"))
 
+    # PDF가 이미 최신인 파일은 건너뜀 (--force로 무시)
+    skipped_count = 0
+    if not args.force:
+        all_count = len(tex_files)
+        tex_files = [tex_file for tex_file in tex_files if not is_up_to_date(tex_file)]
+        skipped_count = all_count - len(tex_files)
+
     print("=" * 80)
     print("📚 전체 PDF 재컴파일")
     print("=" * 80)
+    if skipped_count:
+        print(f"\n최신 PDF가 있는 {skipped_count}개 파일은 건너뜀 (--force로 전체 컴파일)")
     print(f"\n총 {len(tex_files)}개 파일 컴파일 시작...\n")
 
     success_count = 0
     fail_count = 0
     start_time = time.time()
 
-    for i, tex_file in enumerate(tex_files, 1):
-        print(f"[{i}/{len(tex_files)}] {tex_file}")
+    # compile_latex.py는 PDF를 output/<detect_output_filename>으로 복사하는데,
+    # 같은 강의의 한국어/영어 파일(1.tex, 1_en.tex 등)은 같은 이름이 됨
+    # → output 이름별로 묶어서 묶음 안에서는 정렬 순서대로 차례로 컴파일 (마지막 파일이 최종 결과)
+    groups = {}
+    for tex_file in tex_files:
+        groups.setdefault(detect_output_filename(tex_file), []).append(tex_file)
+
+    # 컴파일은 별도 프로세스에서 실행되므로 스레드 풀로 묶음 여러 개를 동시에 실행
+    # (완료된 순서대로 진행 상황 출력)
+    i = 0
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(compile_group, group) for group in groups.values()]
+        for future in as_completed(futures):
+            for tex_file, ok, error in future.result():
+                i += 1
+                print(f"[{i}/{len(tex_files)}] {tex_file}")
+                if error:
+                    print(error)
 
-        if compile_file(tex_file):
-            success_count += 1
-            print(f"  ✓ 성공")
-        else:
-            fail_count += 1
-            print(f"  ✗ 실패")
+                if ok:
+                    success_count += 1
+                    print(f"  ✓ 성공")
+                else:
+                    fail_count += 1
+                    print(f"  ✗ 실패")
 
     elapsed = time.time() - start_time
 
@@ -60,14 +129,10 @@ def main():
     print("=" * 80)
     print(f"✅ 성공: {success_count}개")
     print(f"❌ 실패: {fail_count}개")
+    if skipped_count:
+        print(f"⏭️  건너뜀: {skipped_count}개")
     print(f"⏱️  소요 시간: {elapsed:.1f}초")
     print("=" * 80)
 
 if __name__ == "__main__":
-    import sys
-    import io
-    # Windows console encoding fix
-    if sys.platform == 'win32':
-        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
     main()
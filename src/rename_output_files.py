@@ -15,13 +15,21 @@ def rename_output_files():
         print(f"Error: {output_path} not found")
         return
 
+    # 폴더 목록을 한 번만 읽어서 파일 존재 여부 확인 (Windows처럼 대소문자 구분 없이)
+    with os.scandir(output_path) as it:
+        present = {os.path.normcase(entry.name) for entry in it if entry.is_file()}
+
     # CS109A 파일 (1-20)
     for i in range(1, 21):
         old_name = output_path / f"{i}.pdf"
         new_name = output_path / f"CS109A_lecture_{i:02d}.pdf"
 
-        if old_name.exists() and not new_name.exists():
+        old_key = os.path.normcase(old_name.name)
+        new_key = os.path.normcase(new_name.name)
+        if old_key in present and new_key not in present:
             os.rename(old_name, new_name)
+            present.discard(old_key)
+            present.add(new_key)
             print(f"✓ {old_name.name} → {new_name.name}")
 
     # CSCI103 파일 (1-10) - 이미 변경됨
@@ -32,7 +40,7 @@ def rename_output_files():
 
         # 이 파일들은 CSCI89인지 다른 과목인지 확인 필요
         # 일단 csci89_XX.pdf 형식으로 되어 있는지 확인
-        if old_name.exists():
+        if os.path.normcase(old_name.name) in present:
             print(f"⚠️  {old_name.name}는 수동으로 확인 필요")
 
     print("\n완료!")
@@ -9,9 +9,54 @@ import os
 import re
 from pathlib import Path
 
+# 문서 경계
+_DOCCLASS = '\\documentclass'
+
+# 챕터 제목 패턴
+_SECTION_TITLE_RE = re.compile(r'\\section\{([^}]+)\}')
+_TITLE_TEXTBF_RE = re.compile(r'\\title\{[^}]*\\textbf\{([^}]+)\}')
+
+
+def _write_document(doc: str, i: int, output_base: Path) -> str:
+    """
+    분리된 문서 하나를 lecture_XX/i.tex로 저장
+
+    Args:
+        doc: 문서 내용 (\documentclass부터 다음 \documentclass 직전까지)
+        i: 문서 번호 (1부터)
+        output_base: 출력 기본 디렉토리
+
+    Returns:
+        챕터 제목
+    """
+    # 디렉토리 생성
+    lecture_dir = output_base / f"lecture_{i:02d}"
+    lecture_dir.mkdir(exist_ok=True)
+
+    # 제목 추출 (Unit/Chapter/Module 등)
+    title_match = _SECTION_TITLE_RE.search(doc)
+    if title_match:
+        title = title_match.group(1)
+    else:
+        title_match = _TITLE_TEXTBF_RE.search(doc)
+        if title_match:
+            title = title_match.group(1)
+        else:
+            title = f"Lecture {i}"
+
+    # 파일 저장
+    output_file = lecture_dir / f"{i}.tex"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(doc.strip())
+
+    print(f"  Created: {output_file} - {title[:50]}...")
+    return title
+
+
 def split_tex_file(input_path: str, output_base_dir: str, course_code: str):
     """
     tex 파일을 \documentclass 경계로 분리
+    (줄 단위로 읽으면서 문서 하나가 끝날 때마다 저장하므로 전체 파일을 메모리에 올리지 않음)
 
     Args:
         input_path: 원본 tex 파일 경로
@@ -20,65 +65,43 @@ def split_tex_file(input_path: str, output_base_dir: str, course_code: str):
     """
     print(f"Reading: {input_path}")
 
-    with open(input_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # \documentclass로 분리
-    # 패턴: \documentclass로 시작하는 각 문서
-    pattern = r'(\\documentclass.*?)(?=\\documentclass|$)'
-    documents = re.findall(pattern, content, re.DOTALL)
-
-    print(f"Found {len(documents)} documents in {input_path}")
-
     # 출력 디렉토리 생성
     output_base = Path(output_base_dir)
     output_base.mkdir(parents=True, exist_ok=True)
 
     chapter_titles = []
+    buf = []         # 현재 문서의 줄 목록
+    in_doc = False   # 첫 \documentclass 이전 내용은 버림
 
-    for i, doc in enumerate(documents, 1):
-        # 디렉토리 생성
-        lecture_dir = output_base / f"lecture_{i:02d}"
-        lecture_dir.mkdir(exist_ok=True)
-
-        # 제목 추출 (Unit/Chapter/Module 등)
-        title_match = re.search(r'\\section\{([^}]+)\}', doc)
-        if title_match:
-            title = title_match.group(1)
-        else:
-            title_match = re.search(r'\\title\{[^}]*\\textbf\{([^}]+)\}', doc)
-            if title_match:
-                title = title_match.group(1)
-            else:
-                title = f"Lecture {i}"
-
-        chapter_titles.append(title)
-
-        # 파일 저장
-        output_file = lecture_dir / f"{i}.tex"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(doc.strip())
-
-        print(f"  Created: {output_file} - {title[:50]}...")
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            # \documentclass가 나올 때마다 새 문서 시작 (줄 중간에 있어도 그 위치에서 분리)
+            start = 0
+            pos = line.find(_DOCCLASS)
+            while pos != -1:
+                if in_doc:
+                    buf.append(line[start:pos])
+                    chapter_titles.append(
+                        _write_document(''.join(buf), len(chapter_titles) + 1, output_base)
+                    )
+                buf = []
+                in_doc = True
+                start = pos
+                pos = line.find(_DOCCLASS, pos + 1)
+
+            if in_doc:
+                buf.append(line[start:])
+
+    if in_doc:
+        chapter_titles.append(_write_document(''.join(buf), len(chapter_titles) + 1, output_base))
+
+    print(f"Found {len(chapter_titles)} documents in {input_path}")
 
     return chapter_titles
 
 
-def create_unified_tex(output_base_dir: str, course_code: str, course_name: str, chapter_titles: list):
-    """
-    통합 tex 파일 생성
-
-    Args:
-        output_base_dir: 챕터 파일들이 있는 디렉토리
-        course_code: 과목 코드
-        course_name: 과목 이름
-        chapter_titles: 챕터 제목 리스트
-    """
-    output_base = Path(output_base_dir)
-    num_chapters = len(chapter_titles)
-
-    # 통합본 preamble
-    unified_content = f'''%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+# 통합본 preamble 템플릿 (course_code, course_name)
+_UNIFIED_PREAMBLE_TMPL = '''%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
 % {course_code}: {course_name} - 통합본
 % 자동 생성됨
 %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
@@ -167,11 +190,28 @@ def create_unified_tex(output_base_dir: str, course_code: str, course_name: str,
 
 '''
 
+
+def create_unified_tex(output_base_dir: str, course_code: str, course_name: str, chapter_titles: list):
+    """
+    통합 tex 파일 생성
+
+    Args:
+        output_base_dir: 챕터 파일들이 있는 디렉토리
+        course_code: 과목 코드
+        course_name: 과목 이름
+        chapter_titles: 챕터 제목 리스트
+    """
+    output_base = Path(output_base_dir)
+    num_chapters = len(chapter_titles)
+
+    # 통합본 preamble
+    parts = [_UNIFIED_PREAMBLE_TMPL.format(course_code=course_code, course_name=course_name)]
+
     # 각 챕터 포함
     for i, title in enumerate(chapter_titles, 1):
         # 제목에서 불필요한 부분 정리
         clean_title = title.replace('\\textbf{', '').replace('}', '').strip()
-        unified_content += f'''
+        parts.append(f'''
 %-----------------------------------------------------------------------
 % Chapter {i}
 %-----------------------------------------------------------------------
@@ -181,11 +221,12 @@ def create_unified_tex(output_base_dir: str, course_code: str, course_name: str,
 % 내용은 개별 파일에서 직접 복사하거나 \\input 사용
 % \\input{{lecture_{i:02d}/{i}_content.tex}}
 
-'''
+''')
 
-    unified_content += '''
+    parts.append('''
 \\end{document}
-'''
+''')
+    unified_content = ''.join(parts)
 
     # 통합본 저장
     unified_path = output_base.parent / f"{course_code}_unified.tex"
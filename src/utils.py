@@ -5,10 +5,13 @@ Academic Notes - Utility Functions
 공통으로 사용되는 유틸리티 함수 모음
 """
 
+import mmap
 import os
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterable, Iterator, List, Tuple, Optional
 from datetime import datetime
 
 # Windows 콘솔 인코딩 설정
@@ -17,6 +20,12 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# xelatex가 필요한 패키지/표기 (kotex, xeCJK, fontspec 등)
+_XELATEX_RE = re.compile(r'\\usepackage(?:\[hangul\]\{kotex\}|\{(?:kotex|xeCJK|fontspec)\})|XeLaTeX|xelatex')
+
+# lualatex/luatex 표기 (대소문자 무시)
+_LUATEX_RE = re.compile(r'lua(?:la)?tex', re.IGNORECASE)
+
 
 class ProjectPaths:
     """프로젝트 경로 관리 클래스"""
@@ -37,6 +46,10 @@ class ProjectPaths:
         self.output = self.root / 'output'
         self.school = self.root / 'school'
 
+        # 배치 작업에서 같은 과목/강의 경로를 반복 생성하지 않도록 캐시
+        self._course_cache = {}
+        self._lecture_cache = {}
+
     def get_course_path(self, university: str, course: str) -> Path:
         """
         특정 과목의 경로를 반환
@@ -48,7 +61,11 @@ class ProjectPaths:
         Returns:
             과목 디렉토리 경로
         """
-        return self.school / university / course
+        key = (university, course)
+        path = self._course_cache.get(key)
+        if path is None:
+            path = self._course_cache[key] = self.school / university / course
+        return path
 
     def get_lecture_path(self, university: str, course: str, lecture_num: int) -> Path:
         """
@@ -62,7 +79,13 @@ class ProjectPaths:
         Returns:
             강의 디렉토리 경로
         """
-        return self.get_course_path(university, course) / f'lecture_{lecture_num:02d}'
+        key = (university, course, lecture_num)
+        path = self._lecture_cache.get(key)
+        if path is None:
+            path = self._lecture_cache[key] = (
+                self.get_course_path(university, course) / f'lecture_{lecture_num:02d}'
+            )
+        return path
 
     def get_materials_path(self, university: str, course: str, lecture_num: int) -> Path:
         """
@@ -116,19 +139,165 @@ def find_tex_files(path: Path) -> List[Path]:
     Returns:
         발견된 .tex 파일 목록
     """
-    if path.is_file() and path.suffix == '.tex':
+    # 디렉토리는 scandir 한 번으로 훑음 (DirEntry가 파일 종류를 캐시하므로 추가 stat 없음)
+    try:
+        with os.scandir(path) as it:
+            return [Path(entry.path) for entry in it
+                    if entry.name.endswith('.tex') and entry.is_file()]
+    except OSError:
+        pass
+
+    # 디렉토리가 아니면 .tex 파일인지 확인
+    if path.suffix == '.tex' and path.is_file():
         return [path]
-    elif path.is_dir():
-        return list(path.glob('*.tex'))
-    else:
-        print(f"⚠️  경고: '{path}'는 유효한 .tex 파일이나 디렉토리가 아닙니다.")
-        return []
 
+    print(f"⚠️  경고: '{path}'는 유효한 .tex 파일이나 디렉토리가 아닙니다.")
+    return []
+
+
+def iter_tex(root: str) -> Iterator[str]:
+    """
+    지정된 디렉토리 아래의 .tex 파일을 재귀적으로 찾습니다.
+    os.scandir 기반이므로 Path.rglob보다 stat 호출이 적습니다.
+
+    Args:
+        root: 검색할 디렉토리 경로
+
+    Yields:
+        발견된 .tex 파일 경로 (문자열)
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.tex'):
+                        yield entry.path
+        except OSError:
+            continue  # 접근할 수 없는 디렉토리는 건너뜀
+
+
+def largest_first(paths: Iterable[str]) -> List[str]:
+    """
+    파일을 크기가 큰 순서로 정렬합니다.
+    프로세스 풀에 큰 파일을 먼저 넘기면 마지막에 큰 파일 하나만 남아 기다리는 일이 줄어듭니다.
+
+    Args:
+        paths: 파일 경로 목록
+
+    Returns:
+        크기 내림차순으로 정렬된 경로 리스트 (stat 실패 시 크기 0으로 취급)
+    """
+    def size(path: str) -> int:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    return sorted(paths, key=size, reverse=True)
+
+
+def _decode_mapped(mm: mmap.mmap) -> str:
+    """
+    매핑된 파일 내용을 중간 bytes 복사 없이 UTF-8로 디코딩합니다.
+    open(..., 'r')의 universal newlines와 같이 줄바꿈은 '\\n'으로 통일합니다.
+    """
+    content = str(mm, 'utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def read_text(file_path: str) -> str:
+    """
+    파일 전체를 mmap으로 매핑해서 UTF-8로 디코딩하여 반환합니다.
+    커널 페이지 캐시에서 바로 디코딩하므로 read()로 bytes를 한 번 더 복사하지 않습니다.
+
+    Args:
+        file_path: 읽을 파일 경로
+
+    Returns:
+        파일 내용 (텍스트 모드와 같이 줄바꿈은 '\\n'으로 통일)
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return ''  # 빈 파일은 mmap 불가
+
+        with mm:
+            return _decode_mapped(mm)
+
+
+def read_text_if_contains(file_path: str, needles: Tuple[bytes, ...]) -> Optional[str]:
+    """
+    파일에 needles 중 하나라도 있을 때만 UTF-8로 디코딩하여 반환합니다.
+    mmap으로 바이트 단위 검사를 먼저 하므로, 수정할 대상이 없는 파일은 디코딩하지 않습니다.
+
+    Args:
+        file_path: 읽을 파일 경로
+        needles: 검사할 바이트 문자열 목록
+
+    Returns:
+        파일 내용 (텍스트 모드와 같이 줄바꿈은 '\\n'으로 통일) 또는 None (대상 없음)
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # 빈 파일은 mmap 불가
+
+        with mm:
+            if not any(mm.find(needle) != -1 for needle in needles):
+                return None
+            return _decode_mapped(mm)
+
+
+def write_text_atomic(file_path: str, content: str):
+    """
+    텍스트를 UTF-8로 한 번에 인코딩해서 임시 파일에 쓴 뒤 os.replace로 교체합니다.
+    쓰는 도중 중단되어도 원본 파일이 반쯤 쓰인 상태로 남지 않습니다.
+
+    Args:
+        file_path: 쓸 파일 경로
+        content: 파일 내용 (줄바꿈은 open(..., 'w')와 같이 os.linesep으로 변환)
+    """
+    if os.linesep != '\n':
+        content = content.replace('\n', os.linesep)
+    data = memoryview(content.encode('utf-8'))
+
+    # 기존 파일의 권한 유지
+    try:
+        mode = os.stat(file_path).st_mode & 0o777
+    except OSError:
+        mode = 0o644
 
+    tmp_path = f"{file_path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), mode)
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@lru_cache(maxsize=1)
 def find_xelatex_path() -> str:
     """
     시스템에서 xelatex 실행 파일을 찾습니다.
     TexLive를 우선적으로 사용합니다.
+    설치 경로는 실행 중에 바뀌지 않으므로 결과는 프로세스당 한 번만 탐색합니다.
 
     Returns:
         xelatex 실행 파일 경로 또는 'xelatex'
@@ -168,13 +337,11 @@ def detect_tex_compiler(tex_file: Path) -> str:
             content = f.read(5000)  # 처음 5000자만 확인
 
             # kotex, xeCJK, fontspec 등이 있으면 xelatex 사용
-            if any(pkg in content for pkg in ['\\usepackage{kotex}', '\\usepackage[hangul]{kotex}',
-                                               '\\usepackage{xeCJK}', '\\usepackage{fontspec}',
-                                               'XeLaTeX', 'xelatex']):
+            if _XELATEX_RE.search(content):
                 return find_xelatex_path()
 
             # luatex 관련 패키지가 있으면 lualatex 사용
-            if 'lualatex' in content.lower() or 'luatex' in content.lower():
+            if _LUATEX_RE.search(content):
                 return 'lualatex'
 
     except Exception:
@@ -197,12 +364,24 @@ def cleanup_aux_files(tex_file: Path) -> List[str]:
     aux_extensions = ['.aux', '.log', '.out', '.toc', '.lof', '.lot',
                       '.fls', '.fdb_latexmk', '.synctex.gz', '.xdv']
 
+    # 디렉토리를 한 번만 훑어서 존재하는 보조 파일 찾기 (확장자마다 stat하지 않음)
+    stem = tex_file.stem
+    aux_names = {os.path.normcase(stem + ext): ext for ext in aux_extensions}
+    found = {}
+    try:
+        with os.scandir(tex_file.parent) as it:
+            for entry in it:
+                ext = aux_names.get(os.path.normcase(entry.name))
+                if ext is not None:
+                    found[ext] = entry.path
+    except OSError:
+        return []
+
     cleaned = []
     for ext in aux_extensions:
-        aux_file = tex_file.with_suffix(ext)
-        if aux_file.exists():
+        if ext in found:
             try:
-                aux_file.unlink()
+                os.unlink(found[ext])
                 cleaned.append(ext)
             except Exception:
                 pass  # 삭제 실패해도 무시
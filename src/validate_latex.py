@@ -5,15 +5,20 @@ LaTeX 파일 검증 및 자동 수정 스크립트
 latex_upgrade.txt 기준으로 모든 TEX 파일을 검증하고 수정합니다.
 """
 
-import sys
 import io
+import sys
 import re
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 
-# Windows 콘솔 인코딩 설정
-if sys.platform == 'win32':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# 프로젝트 루트를 Python 경로에 추가 (Windows 콘솔 인코딩 설정은 src.utils에서 처리)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import iter_tex, largest_first, read_text, write_text_atomic
 
 # 마스터 템플릿 헤더
 MASTER_TEMPLATE_HEADER = """%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
@@ -36,6 +41,40 @@ COURSE_META = {
     }
 }
 
+# 경로에서 과목 코드(COURSE_META 키)를 찾는 패턴
+_COURSE_KEY_RE = re.compile('(' + '|'.join(map(re.escape, COURSE_META)) + ')', re.IGNORECASE)
+
+# 짝을 검사할 주요 환경들 (보고 순서 유지를 위해 튜플, 순서 조회용 dict)
+_TRACKED_ENVS = ('itemize', 'enumerate', 'tabular', 'table', 'figure',
+                 'equation', 'align', 'lstlisting', 'verbatim',
+                 'summarybox', 'warningbox', 'examplebox', 'infobox',
+                 'overviewbox', 'definitionbox', 'importantbox', 'cautionbox',
+                 'tcolorbox', 'center', 'minipage')
+_TRACKED_ORDER = {env: i for i, env in enumerate(_TRACKED_ENVS)}
+
+# \begin{document} 이후에 오면 안 되는 프리앰블 명령어 (보고 순서대로)
+_PREAMBLE_COMMANDS = ('usepackage', 'newcommand', 'renewcommand',
+                      'newtcolorbox', 'definecolor', 'tcbuselibrary')
+_PREAMBLE_RE = re.compile(r'\\(' + '|'.join(_PREAMBLE_COMMANDS) + r')\{[^}]*\}')
+_PREAMBLE_ORDER = {name: i for i, name in enumerate(_PREAMBLE_COMMANDS)}
+
+_NEWLINE_RE = re.compile(r'\n')
+
+_DOC_BEGIN = '\\begin{document}'
+
+# \begin{...} / \end{...} 토큰
+_ENV_RE = re.compile(r'\\(begin|end)\{([A-Za-z*]+)\}')
+
+# tabular 환경과 컬럼 지정 문자
+_TABULAR_RE = re.compile(r'\\begin\{tabular\}\{([^}]+)\}')
+_COLUMN_RE = re.compile(r'[lcr|p]')
+
+# \metainfo{...}{...}{...}{...} 블록
+_METAINFO_RE = re.compile(r'(\\metainfo\{[^}]*\}\{[^}]*\}\{[^}]*\}\{[^}]*\})')
+
+# 경로의 강의 번호 (lecture_01 등)
+_LECTURE_NUM_RE = re.compile(r'lecture_(\d+)', re.IGNORECASE)
+
 
 class LaTeXValidator:
     """LaTeX 파일 검증 및 수정 클래스"""
@@ -46,12 +85,27 @@ class LaTeXValidator:
         self.issues = []
         self.fixes = []
         self.modified = False
+        # \begin{document} 바로 뒤 위치 (없으면 -1)
+        # 모든 수정은 이 위치 뒤에서만 일어나므로 load()에서 한 번만 계산
+        self._doc_start = -1
+        # 줄바꿈 위치 캐시 (content가 바뀌면 다시 계산)
+        self._nl_source = None
+        self._nl_offsets = []
+
+    def _lineno(self, pos: int) -> int:
+        """content의 pos 위치가 속한 라인 번호 (1부터)"""
+        if self._nl_source is not self.content:
+            self._nl_offsets = [m.start() for m in _NEWLINE_RE.finditer(self.content)]
+            self._nl_source = self.content
+        return bisect_left(self._nl_offsets, pos) + 1
 
     def load(self) -> bool:
         """파일 읽기"""
         try:
-            with open(self.tex_file, 'r', encoding='utf-8') as f:
-                self.content = f.read()
+            # mmap으로 매핑해서 바로 디코딩 (매핑은 읽은 뒤 바로 닫으므로 save()와 충돌 없음)
+            self.content = read_text(str(self.tex_file))
+            idx = self.content.find(_DOC_BEGIN)
+            self._doc_start = idx + len(_DOC_BEGIN) if idx >= 0 else -1
             return True
         except Exception as e:
             print(f"  [ERROR] 파일 읽기 실패: {e}")
@@ -62,8 +116,8 @@ class LaTeXValidator:
         if not self.modified:
             return True
         try:
-            with open(self.tex_file, 'w', encoding='utf-8') as f:
-                f.write(self.content)
+            # 한 번에 인코딩해서 임시 파일에 쓴 뒤 교체
+            write_text_atomic(str(self.tex_file), self.content)
             return True
         except Exception as e:
             print(f"  [ERROR] 파일 저장 실패: {e}")
@@ -73,39 +127,39 @@ class LaTeXValidator:
         """
         검증 1: \\begin{document} 이후 프리앰블 명령 체크
         """
-        doc_match = re.search(r'\\begin\{document\}', self.content)
-        if not doc_match:
+        doc_start = self._doc_start
+        if doc_start < 0:
             self.issues.append("\\begin{document} 없음")
             return False
 
-        doc_start = doc_match.end()
         body = self.content[doc_start:]
 
-        # 프리앰블 명령어 패턴
-        preamble_patterns = [
-            (r'\\usepackage\{[^}]*\}', 'usepackage'),
-            (r'\\newcommand\{[^}]*\}', 'newcommand'),
-            (r'\\renewcommand\{[^}]*\}', 'renewcommand'),
-            (r'\\newtcolorbox\{[^}]*\}', 'newtcolorbox'),
-            (r'\\definecolor\{[^}]*\}', 'definecolor'),
-            (r'\\tcbuselibrary\{[^}]*\}', 'tcbuselibrary'),
-        ]
-
+        # 한 번의 스캔으로 모든 프리앰블 명령어 찾기
         found_issues = []
-        for pattern, name in preamble_patterns:
-            matches = list(re.finditer(pattern, body))
-            if matches:
-                for match in matches:
-                    line_num = self.content[:doc_start + match.start()].count('\n') + 1
-                    found_issues.append((name, line_num, match.group()))
+        removals = []
+        for match in _PREAMBLE_RE.finditer(body):
+            found_issues.append((match.group(1), self._lineno(doc_start + match.start())))
+            # 자동 수정 대상: 바로 뒤에 줄바꿈이 오는 명령 (줄바꿈까지 제거)
+            if body.startswith('\n', match.end()):
+                removals.append((match.start(), match.end() + 1))
 
         if found_issues:
-            for name, line, cmd in found_issues:
+            # 자동 수정: 해당 라인들을 잘라내고 한 번에 다시 조립
+            if removals:
+                pieces = [self.content[:doc_start]]
+                prev = 0
+                for start, end in removals:
+                    pieces.append(body[prev:start])
+                    prev = end
+                pieces.append(body[prev:])
+                self.content = ''.join(pieces)
+
+            # 명령어 종류별로 보고 (같은 종류 안에서는 위치 순서)
+            found_issues.sort(key=lambda issue: _PREAMBLE_ORDER[issue[0]])
+            for name, line in found_issues:
                 self.issues.append(f"\\begin{{document}} 이후 {name} 명령 발견 (라인 {line})")
-                # 자동 수정: 해당 라인 제거
-                self.content = self.content.replace(cmd + '\n', '')
                 self.fixes.append(f"{name} 명령 제거 (라인 {line})")
-                self.modified = True
+            self.modified = True
             return False
         return True
 
@@ -113,34 +167,29 @@ class LaTeXValidator:
         """
         검증 2: 닫히지 않은 환경 검사
         """
-        # 주요 환경들
-        envs = ['itemize', 'enumerate', 'tabular', 'table', 'figure',
-                'equation', 'align', 'lstlisting', 'verbatim',
-                'summarybox', 'warningbox', 'examplebox', 'infobox',
-                'overviewbox', 'definitionbox', 'importantbox', 'cautionbox',
-                'tcolorbox', 'center', 'minipage']
+        # 한 번의 스캔으로 환경별 begin/end 개수 집계
+        begins, ends = Counter(), Counter()
+        for match in _ENV_RE.finditer(self.content):
+            (begins if match.group(1) == 'begin' else ends)[match.group(2)] += 1
 
-        issues_found = False
-        for env in envs:
-            begins = len(re.findall(rf'\\begin\{{{env}\}}', self.content))
-            ends = len(re.findall(rf'\\end\{{{env}\}}', self.content))
-
-            if begins != ends:
-                self.issues.append(f"환경 불일치: {env} (begin: {begins}, end: {ends})")
-                issues_found = True
+        # 파일에 실제로 나온 추적 대상 환경만 비교 (보고는 _TRACKED_ENVS 순서)
+        seen = (begins.keys() | ends.keys()) & _TRACKED_ORDER.keys()
+        mismatched = sorted((env for env in seen if begins[env] != ends[env]),
+                            key=_TRACKED_ORDER.__getitem__)
+        for env in mismatched:
+            self.issues.append(f"환경 불일치: {env} (begin: {begins[env]}, end: {ends[env]})")
 
-        return not issues_found
+        return not mismatched
 
     def check_first_page_structure(self) -> bool:
         """
         검증 3: 첫 페이지 구조 통일 확인
         표준: \\begin{document} → \\thispagestyle{firstpage} → \\metainfo → \\tableofcontents
         """
-        doc_match = re.search(r'\\begin\{document\}', self.content)
-        if not doc_match:
+        doc_start = self._doc_start
+        if doc_start < 0:
             return False
 
-        doc_start = doc_match.end()
         # 첫 500자 정도만 확인
         first_part = self.content[doc_start:doc_start + 2000]
 
@@ -170,17 +219,16 @@ class LaTeXValidator:
     def _add_metainfo(self):
         """메타정보 블록 추가"""
         # 과목 감지
-        path_str = str(self.tex_file).lower()
-        course = None
+        # 패턴이 대소문자를 무시하므로 소문자 사본을 만들지 않음
+        path_str = str(self.tex_file)
         lecture_num = "01"
 
-        for key in COURSE_META:
-            if key in path_str:
-                course = key
-                break
+        # 경로에서 가장 앞에 나오는 과목 코드 (보통 school/<대학>/<과목>/ 디렉토리)
+        match = _COURSE_KEY_RE.search(path_str)
+        course = match.group(1).lower() if match else None
 
         # 강의 번호 감지
-        match = re.search(r'lecture_(\d+)', path_str)
+        match = _LECTURE_NUM_RE.search(path_str)
         if match:
             lecture_num = match.group(1).zfill(2)
 
@@ -189,9 +237,8 @@ class LaTeXValidator:
             metainfo = f'\\metainfo{{{meta["name"]}}}{{Lecture {lecture_num}}}{{{meta["prof"]}}}{{Lecture {lecture_num}의 핵심 개념 학습}}'
 
             # \begin{document} 바로 다음에 추가
-            doc_match = re.search(r'(\\begin\{document\})', self.content)
-            if doc_match:
-                insert_pos = doc_match.end()
+            if self._doc_start >= 0:
+                insert_pos = self._doc_start
                 insert_text = f'\n\n\\thispagestyle{{firstpage}}\n\n{metainfo}\n'
                 self.content = self.content[:insert_pos] + insert_text + self.content[insert_pos:]
                 self.fixes.append("metainfo 블록 추가")
@@ -200,7 +247,7 @@ class LaTeXValidator:
     def _add_tableofcontents(self):
         """목차 추가"""
         # metainfo 다음에 추가
-        metainfo_match = re.search(r'(\\metainfo\{[^}]*\}\{[^}]*\}\{[^}]*\}\{[^}]*\})', self.content)
+        metainfo_match = _METAINFO_RE.search(self.content)
         if metainfo_match:
             insert_pos = metainfo_match.end()
             insert_text = '\n\n\\tableofcontents\n\\newpage\n'
@@ -213,15 +260,16 @@ class LaTeXValidator:
         검증 4: 표 가로 크기 자동 조절 확인
         넓은 표는 adjustbox로 감싸야 함
         """
-        # tabular 환경 찾기
-        tabular_pattern = r'\\begin\{tabular\}\{([^}]+)\}'
-        matches = list(re.finditer(tabular_pattern, self.content))
+        # 표가 없으면 정규식 스캔 생략
+        if '\\begin{tabular}' not in self.content:
+            return True
 
+        # tabular 환경 찾기
         issues_found = False
-        for match in matches:
+        for match in _TABULAR_RE.finditer(self.content):
             col_spec = match.group(1)
             # 컬럼이 5개 이상이면 넓은 표로 판단
-            col_count = len(re.findall(r'[lcr|p]', col_spec))
+            col_count = len(_COLUMN_RE.findall(col_spec))
 
             if col_count >= 5:
                 # adjustbox로 감싸져 있는지 확인
@@ -230,7 +278,7 @@ class LaTeXValidator:
                 before = self.content[max(0, start-100):start]
 
                 if 'adjustbox' not in before:
-                    line_num = self.content[:start].count('\n') + 1
+                    line_num = self._lineno(start)
                     self.issues.append(f"넓은 표({col_count}컬럼)가 adjustbox 없음 (라인 {line_num})")
                     issues_found = True
 
@@ -240,7 +288,9 @@ class LaTeXValidator:
         """
         검증 5: 마스터 템플릿 헤더 확인
         """
-        if MASTER_TEMPLATE_HEADER not in self.content[:500]:
+        # 헤더는 보통 파일 맨 앞에 있음 (BOM 등이 앞에 있어도 처음 500자 안이면 통과, 슬라이스 복사 없이 검사)
+        if not (self.content.startswith(MASTER_TEMPLATE_HEADER)
+                or self.content.find(MASTER_TEMPLATE_HEADER, 0, 500) != -1):
             self.issues.append("마스터 템플릿 헤더 없음")
             return False
         return True
@@ -273,13 +323,23 @@ class LaTeXValidator:
 
 def find_tex_files(base_path: Path) -> List[Path]:
     """harvard 폴더 내 모든 .tex 파일 찾기"""
-    tex_files = []
     harvard_path = base_path / "school" / "harvard"
 
-    if harvard_path.exists():
-        tex_files = list(harvard_path.rglob("*.tex"))
+    # 폴더가 없으면 iter_tex가 빈 결과를 반환
+    return sorted(Path(p) for p in iter_tex(str(harvard_path)))
 
-    return sorted(tex_files)
+
+def _validate_captured(tex_file: Path) -> Tuple[Dict, str]:
+    """
+    파일 하나를 검증하고 출력을 모아서 반환 (프로세스 풀 작업용)
+
+    Returns:
+        (검증 결과, 출력 문자열) 튜플
+    """
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = LaTeXValidator(tex_file).validate_all()
+    return result, buffer.getvalue()
 
 
 def main():
@@ -304,29 +364,35 @@ def main():
     passed_files = []
     failed_files = []
 
-    for tex_file in tex_files:
-        relative_path = tex_file.relative_to(base_path)
-        print(f"검증 중: {relative_path}")
+    # 파일별 검증은 서로 독립적이므로 프로세스 풀에서 병렬 처리
+    # 작업은 큰 파일부터 제출하고, 출력은 파일명 순서대로 표시
+    with ProcessPoolExecutor() as executor:
+        futures = {
+            tex_file: executor.submit(_validate_captured, tex_file)
+            for tex_file in largest_first(tex_files)
+        }
+        for tex_file in tex_files:
+            result, output = futures[tex_file].result()
+            relative_path = tex_file.relative_to(base_path)
+            # 파일별 출력은 모아서 한 번에 쓰기
+            buf = [f"검증 중: {relative_path}\n", output]
 
-        validator = LaTeXValidator(tex_file)
-        result = validator.validate_all()
+            results["files"][str(relative_path)] = result
 
-        results["files"][str(relative_path)] = result
+            if result["success"]:
+                results["passed"] += 1
+                passed_files.append(relative_path)
+                buf.append("  [PASS] 모든 검증 통과\n")
+            else:
+                results["failed"] += 1
+                failed_files.append((relative_path, result))
+                buf.extend(f"  [ISSUE] {issue}\n" for issue in result["issues"])
+                buf.extend(f"  [FIX] {fix}\n" for fix in result["fixes"])
 
-        if result["success"]:
-            results["passed"] += 1
-            passed_files.append(relative_path)
-            print(f"  [PASS] 모든 검증 통과")
-        else:
-            results["failed"] += 1
-            failed_files.append((relative_path, result))
-            for issue in result["issues"]:
-                print(f"  [ISSUE] {issue}")
-            for fix in result["fixes"]:
-                print(f"  [FIX] {fix}")
+            if result["modified"]:
+                results["modified"] += 1
 
-        if result["modified"]:
-            results["modified"] += 1
+            sys.stdout.write(''.join(buf))
 
     # 결과 보고서 출력
     print("\n")
@@ -340,19 +406,17 @@ def main():
     print(f"수정됨: {results['modified']}개")
 
     if failed_files:
-        print("\n=== 문제가 있는 파일 목록 ===\n")
+        buf = ["\n=== 문제가 있는 파일 목록 ===\n\n"]
         for i, (path, result) in enumerate(failed_files, 1):
-            print(f"{i}. {path}")
-            for issue in result["issues"]:
-                print(f"   - [문제] {issue}")
-            for fix in result["fixes"]:
-                print(f"   - [해결] {fix}")
-            print()
+            buf.append(f"{i}. {path}\n")
+            buf.extend(f"   - [문제] {issue}\n" for issue in result["issues"])
+            buf.extend(f"   - [해결] {fix}\n" for fix in result["fixes"])
+            buf.append("\n")
+        sys.stdout.write(''.join(buf))
 
     if passed_files:
-        print("\n=== 검증 통과 파일 ===\n")
-        for path in passed_files:
-            print(f"- {path} [OK]")
+        sys.stdout.write("\n=== 검증 통과 파일 ===\n\n"
+                         + ''.join(f"- {path} [OK]\n" for path in passed_files))
 
     print("\n=== 최종 통계 ===")
     print(f"[OK] 에러 없음: {results['passed']}개")